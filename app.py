@@ -1,20 +1,11 @@
 import streamlit as st
-import pandas as pd
-import os
-import joblib
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_absolute_error
-
-from src.auth import require_login, logout_button
-from src.data_loader import load_stock_data
-from src.features import add_features, prepare_dataset
-from src.signals import generate_signals
-from src.charts import candlestick_chart
-from src.watchlist import get_watchlist, add_to_watchlist, remove_from_watchlist
-from src.models_ml import get_model, rmse
-from src.forecast import forecast_next_days
-from src.sentiment import analyze_news_sentiment
-from src.report_pdf import create_pdf_report
+
+# ✅ Only what the login page needs is imported up front; everything else loads after login
+from src.auth import ADMIN_USERNAME, require_login, logout_button
+
+
+# Bar intervals offered in the sidebar; the store resamples 4h/30m/15m from finer stored bars
+BAR_INTERVALS = ["1d", "1h", "4h", "30m", "15m", "5m", "1m"]
 
 
 # ✅ No guessing. Only clean input.
@@ -44,6 +35,27 @@ st.caption("✅ Watchlist + News Sentiment + Candlestick + RSI/MACD + Forecast +
 
 logout_button()
 
+import pandas as pd
+
+from src.signals import RULES
+from src.watchlist import get_watchlist, add_to_watchlist, remove_from_watchlist
+from src.store import REFRESH_SECONDS, store_key
+from src.cache import StageCache, data_version, time_bucket
+from src.models_ml import available_models
+from src.sentiment import FEED_TTL_SECONDS
+from src.profiling import RunTimer, STATS
+from src.stages import StageGraph
+from src.jobs import JobFailed, JobPending, estimated_progress, get_job_queue
+from src.exports import EXPORT_FORMATS, get_export_store
+from src.pipeline import AUTO_MODEL, MAX_HORIZON, slice_forecast
+
+
+# ✅ One stage cache per server process, shared by every session
+@st.cache_resource
+def get_stage_cache() -> StageCache:
+    return StageCache()
+
+
 
 # ---------------- SIDEBAR ----------------
 st.sidebar.header("⚙️ Controls")
@@ -70,13 +82,25 @@ else:
 st.sidebar.success(f"Using Symbol: {symbol}")
 
 start_date = st.sidebar.date_input("Start Date", pd.to_datetime("2018-01-01"))
-forecast_days = st.sidebar.slider("Forecast Days", 1, 14, 7)
+interval = st.sidebar.selectbox("Bar Interval", BAR_INTERVALS)
+if interval != "1d":
+    st.sidebar.caption("Yahoo keeps ~30 days of 1m, ~60 days of 5m and ~2 years of 1h bars")
+forecast_days = st.sidebar.slider("Forecast Days", 1, MAX_HORIZON, 7)
 
+# AUTO_MODEL cross-validates every candidate and forecasts with the winner
 model_name = st.sidebar.selectbox(
     "Select Model",
-    ["Linear Regression", "Random Forest"]
+    available_models() + [AUTO_MODEL],
+    format_func=lambda m: "🏆 Auto (best by CV)" if m == AUTO_MODEL else m
 )
 
+# Forests fit each tree on this share of the rows: faster fits and a lower memory peak on long histories
+MAX_SAMPLES = {"All rows": None, "75%": 0.75, "50%": 0.5, "25%": 0.25}
+max_samples = MAX_SAMPLES[st.sidebar.select_slider("Rows per tree (forests)", list(MAX_SAMPLES))]
+
+strategy = st.sidebar.selectbox("Signal Strategy", list(RULES))
+export_format = st.sidebar.selectbox("Export Format", list(EXPORT_FORMATS))
+
 run_btn = st.sidebar.button("🚀 Run Dashboard")
 
 
@@ -100,166 +124,353 @@ st.sidebar.info("🇺🇸 US: AAPL, TSLA, MSFT")
 st.sidebar.info("🇮🇳 NSE: RELIANCE.NS, TCS.NS, INFY.NS")
 
 
+cache = get_stage_cache()
+exports = get_export_store()  # ✅ content-addressed: identical exports are written once
+with st.sidebar.expander("🧮 Cache stats"):
+    st.dataframe(cache.stats(), use_container_width=True)
+    st.caption(f"{len(cache)} entries, {cache.size_bytes / 1024 ** 2:.1f} MB")
+
+with st.sidebar.expander("⏱ Stage stats (all sessions)"):
+    st.dataframe(pd.DataFrame(STATS.snapshot()).T, use_container_width=True)
+    st.download_button("⬇️ Stats JSON", data=STATS.to_json(), file_name="stage_stats.json", mime="application/json")
+    st.download_button("⬇️ Prometheus", data=STATS.to_prometheus(), file_name="stage_stats.prom", mime="text/plain")
+
+# ✅ Model fits run in a shared background worker pool, not in this script thread
+jobs = get_job_queue()
+is_admin = username == ADMIN_USERNAME
+with st.sidebar.expander("🧵 Jobs (all users)" if is_admin else "🧵 My jobs"):
+    # ✅ Other users' symbols and errors are only visible to the admin
+    st.dataframe(jobs.recent(user=None if is_admin else username), use_container_width=True)
+    st.caption(f"{jobs.max_workers} worker(s)")
+
+profile_this_run = st.sidebar.checkbox("🔬 Profile this run (cProfile + tracemalloc)")
+
+
 # ---------------- MAIN ----------------
-if not run_btn:
+# ✅ Keep showing results after Run, so later widget changes rerun from cache
+if run_btn:
+    st.session_state["dashboard_ran"] = True
+
+if not st.session_state.get("dashboard_ran"):
     st.info("👈 Select stock + model and click **Run Dashboard**")
     st.stop()
 
+timer = RunTimer(profile=profile_this_run)
+
+
+# ---------------- STAGES ----------------
+# ✅ Nothing runs up front: each view asks for the stages it needs, results stay in the session.
+# Stage modules (sklearn, textblob, plotly, fpdf ...) are imported the first time their stage runs.
+series = store_key(symbol, interval)  # features and models are kept per symbol and interval
+
+def load_stage():
+    from src.data_loader import load_stock_data
+    return load_stock_data(symbol, start=str(start_date), interval=interval)
+
+def features_stage(df):
+    from src.feature_store import get_features
+    # ✅ Memory-mapped feature matrix shared by charts, signals, training and backtest
+    return get_features(series, df, data_version(df), interval=interval)
+
+def signals_stage(df_feat):
+    from src.signals import generate_signals
+    return generate_signals(df_feat, rule=strategy)
+
+def chart_stage(df_signals):
+    from src.charts import candlestick_chart
+    return candlestick_chart(df_signals)
+
+def sentiment_stage():
+    from src.sentiment import analyze_news_sentiment
+    return analyze_news_sentiment(symbol)
+
+def _expected_fit_seconds(model: str):
+    from src.registry import get_registry
+    fit_stats = get_registry().info(series, model, MAX_HORIZON).get("fit_stats") or {}
+    return fit_stats.get("fit_seconds")
+
+def job_inputs() -> dict:
+    # What a worker needs to recompute the features if the stored version was pruned
+    return {"series": series, "symbol": symbol, "start": str(start_date), "interval": interval}
+
+def select_stage(df_feat):
+    if model_name != AUTO_MODEL:
+        return model_name, None
+    # Raises JobPending until the worker pool has cross-validated every candidate
+    version = graph.version("load")
+    return jobs.run(
+        "select", {**job_inputs(), "data_version": version},
+        key_parts=(series, version, _feature_version()), group_parts=(series,),
+        label=f"{series} model selection", user=username
+    )
 
-# ---------------- LOAD DATA ----------------
-try:
-    df = load_stock_data(symbol, start=str(start_date))
-except Exception as e:
-    st.error(f"❌ Failed to load stock data for: {symbol}")
-    st.warning("✅ Examples: AAPL, TSLA, RELIANCE.NS, TCS.NS")
-    st.exception(e)
-    st.stop()
+def forecast_stage(df_feat, selection):
+    # Keyed by (series, model, data version): identical requests from any session share one fit.
+    # The job forecasts MAX_HORIZON days; the slider only picks how many of them are shown
+    version = graph.version("load")
+    model = selection[0]
+    return jobs.run(
+        "forecast", {**job_inputs(), "data_version": version, "model": model, "horizon": MAX_HORIZON,
+                     "max_samples": max_samples},
+        key_parts=(series, model, max_samples, version, _feature_version()),
+        group_parts=(series, model),
+        label=f"{series} {model}", user=username,
+        expected_seconds=_expected_fit_seconds(model)
+    )
 
+def backtest_stage(df_signals):
+    from src.backtest import backtest
+    return backtest(df_signals["Close"], df_signals["Signal"], cost=0.001)
 
-# ---------------- FEATURES ----------------
-df_feat = add_features(df)
-df_signals = generate_signals(df_feat)
-latest = df_signals.iloc[-1]
+def forecast_export_stage(result):
+    return exports.export_bytes(f"{series}_forecast", slice_forecast(result, forecast_days)["future_df"],
+                                export_format)
 
+def report_export_stage(df_signals):
+    from src.pipeline import report_frame
+    return exports.export_bytes(f"{series}_report", report_frame(df_signals), export_format)
 
-# ---------------- NEWS SENTIMENT ----------------
-st.subheader("📰 Live News Sentiment")
+def history_export_stage(df_signals):
+    from src.pipeline import report_frame
+    return exports.export_bytes(f"{series}_history", report_frame(df_signals, rows=None), export_format)
 
-try:
-    sent_avg, news_items = analyze_news_sentiment(symbol)
-except Exception:
-    sent_avg, news_items = 0.0, []
-    st.warning("⚠️ News sentiment unavailable (RSS issue).")
+def pdf_stage(result, df_signals):
+    from src.report_pdf import export_pdf_report
+    from src.signals import signal_label
+    try:
+        sent_avg = graph.get("sentiment")[0]
+    except Exception:
+        sent_avg = 0.0
+    future_df = slice_forecast(result, forecast_days)["future_df"]
+    path = export_pdf_report(
+        symbol, future_df, signal_label(df_signals["Signal"].iloc[-1], emoji=False), sent_avg,
+        closes=df_signals["Close"].tail(250).to_numpy(), name=series
+    )
+    with open(path, "rb") as f:
+        return f.read()
 
-colA, colB, colC = st.columns(3)
-colA.metric("Average Sentiment", f"{sent_avg:.3f}")
 
-if sent_avg > 0.1:
-    colB.success("✅ Positive News")
-elif sent_avg < -0.1:
-    colB.error("❌ Negative News")
-else:
-    colB.warning("⚠️ Neutral News")
+def _feature_version():
+    from src.feature_store import feature_version
+    return feature_version()
 
-colC.metric("Articles Fetched", str(len(news_items)))
 
-if news_items:
-    news_df = pd.DataFrame(news_items)[["title", "published", "sentiment", "link"]]
-    st.dataframe(news_df, use_container_width=True)
+graph = StageGraph(results=st.session_state.setdefault("stage_results", {}), cache=cache, timer=timer)
+graph.add("load", load_stage, params=(symbol, interval, str(start_date), time_bucket(REFRESH_SECONDS)),
+          version=data_version)
+graph.add("features", features_stage, deps=["load"], params=(series, _feature_version()))
+graph.add("signals", signals_stage, deps=["features"], params=(strategy,))
+graph.add("chart", chart_stage, deps=["signals"])
+graph.add("sentiment", sentiment_stage, params=(symbol, time_bucket(FEED_TTL_SECONDS)))
+graph.add("select", select_stage, deps=["features"], params=(model_name,))
+graph.add("forecast", forecast_stage, deps=["features", "select"], params=(series, max_samples))
+graph.add("backtest", backtest_stage, deps=["signals"])
+graph.add("forecast_export", forecast_export_stage, deps=["forecast"], params=(export_format, forecast_days))
+graph.add("report_export", report_export_stage, deps=["signals"], params=(export_format,))
+graph.add("history_export", history_export_stage, deps=["signals"], params=(export_format,))
+graph.add("pdf", pdf_stage, deps=["forecast", "signals"], params=(forecast_days, time_bucket(FEED_TTL_SECONDS)))
 
-st.markdown("---")
+# Stages each view renders from; exports (CSV/PDF) only run when their button is pressed
+VIEWS = {
+    "📊 Charts": ["signals", "chart"],
+    "📰 News": ["sentiment"],
+    "🤖 Forecast & Export": ["select", "forecast"],
+    "📌 Signals": ["signals", "backtest"],
+}
 
+view = st.radio("View", list(VIEWS), horizontal=True, key="view", label_visibility="collapsed")
 
-# ---------------- TABS ----------------
-tab1, tab2, tab3 = st.tabs(["📊 Charts", "🤖 Forecast & Export", "📌 Signals"])
+
+# ---------------- LOAD DATA ----------------
+if "load" in graph.requires(VIEWS[view]):
+    try:
+        graph.get("load")
+    except Exception as e:
+        st.error(f"❌ Failed to load stock data for: {symbol}")
+        st.warning("✅ Examples: AAPL, TSLA, RELIANCE.NS, TCS.NS")
+        st.exception(e)
+        st.stop()
+
+
+# Export errors raised on click; the callable runs outside the script, so they are shown on the next run
+export_errors = st.session_state.setdefault("export_errors", {})
 
 
-# TAB 1 - Charts
-with tab1:
+def download(label: str, stage: str, file_name: str, mime: str):
+    # Deferred: the stage runs on click, and the click does not rerun the script
+    def build():
+        try:
+            data = graph.get(stage)
+        except Exception as e:
+            export_errors[stage] = (label, e)
+            raise
+        export_errors.pop(stage, None)
+        return data
+
+    failed = export_errors.get(stage)
+    if failed is not None:
+        st.warning(f"⚠️ {failed[0]} failed, try again or pick another format.")
+        st.exception(failed[1])
+    st.download_button(label, data=build, file_name=file_name, mime=mime, on_click="ignore")
+
+
+# VIEW - Charts
+if view == "📊 Charts":
+    from src.signals import label_signals
+
+    df_signals = graph.get("signals")
     st.subheader(f"📌 Candlestick + RSI + MACD : {symbol}")
-    st.plotly_chart(candlestick_chart(df_signals), use_container_width=True)
+    st.plotly_chart(graph.get("chart"), use_container_width=True)
 
     st.subheader("📄 Latest Data")
-    st.dataframe(df_signals.tail(20), use_container_width=True)
+    latest_rows = df_signals.tail(20)
+    st.dataframe(latest_rows.assign(Signal=label_signals(latest_rows["Signal"])), use_container_width=True)
 
 
-# TAB 2 - Forecast + Export
-with tab2:
-    st.subheader("🤖 Model Forecast + Export")
+# VIEW - News
+elif view == "📰 News":
+    st.subheader("📰 Live News Sentiment")
+
+    try:
+        sent_avg, news_items = graph.get("sentiment")
+    except Exception:
+        sent_avg, news_items = 0.0, []
+        st.warning("⚠️ News sentiment unavailable (RSS issue).")
 
-    X, y, final_df, feature_cols = prepare_dataset(df_feat)
+    colA, colB, colC = st.columns(3)
+    colA.metric("Average Sentiment", f"{sent_avg:.3f}")
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, shuffle=False
-    )
+    if sent_avg > 0.1:
+        colB.success("✅ Positive News")
+    elif sent_avg < -0.1:
+        colB.error("❌ Negative News")
+    else:
+        colB.warning("⚠️ Neutral News")
 
-    model = get_model(model_name)
-    model.fit(X_train, y_train)
+    colC.metric("Articles Fetched", str(len(news_items)))
 
-    # ✅ Save model properly
-    os.makedirs("models", exist_ok=True)
-    safe_model_name = model_name.replace(" ", "_")
-    model_path = f"models/{symbol}_{safe_model_name}.pkl"
-    joblib.dump(model, model_path)
+    if news_items:
+        news_df = pd.DataFrame(news_items)[["title", "published", "sentiment", "link"]]
+        st.dataframe(news_df, use_container_width=True)
 
-    st.success(f"✅ Model saved: {model_path}")
 
-    # Evaluate
-    preds = model.predict(X_test)
-    mae = mean_absolute_error(y_test, preds)
-    r = rmse(y_test.values, preds)
+# VIEW - Forecast + Export
+elif view == "🤖 Forecast & Export":
+    st.subheader("🤖 Model Forecast + Export")
 
-    c1, c2, c3 = st.columns(3)
-    c1.metric("Model", model_name)
-    c2.metric("MAE", f"{mae:.4f}")
-    c3.metric("RMSE", f"{r:.4f}")
+    try:
+        chosen_model, leaderboard = graph.get("select")
+        result = graph.get("forecast")
+    except JobPending as pending:
+        job_key = pending.job["job_key"]
+
+        # ✅ Only this block reruns while the job is in flight; the page stays usable
+        @st.fragment(run_every=2)
+        def job_status():
+            job = jobs.status(job_key)
+            if job is None or job["status"] not in ("queued", "running"):
+                st.rerun()
+            st.info(f"⏳ {job['label']}: {job['status']}" + (f" ({job['message']})" if job["message"] else ""))
+            st.progress(estimated_progress(job))
+
+        job_status()
+        st.stop()
+    except JobFailed as failed:
+        st.error(f"❌ {failed}")
+        if st.button("🔁 Retry"):
+            jobs.retry(failed.job["job_key"])
+            st.rerun()
+        st.stop()
+
+
+    if leaderboard is not None:
+        st.info(f"🏆 Best model by walk-forward CV: **{chosen_model}**")
+        with st.expander("📋 Model leaderboard (TimeSeriesSplit, next-day target)"):
+            st.dataframe(leaderboard, use_container_width=True)
+
+    if "forecast" not in graph.computed:
+        # Nothing was fitted or loaded in this run: the forecast is reused from this session or another one
+        st.info(f"♻️ Reused forecast of model: {result['model_path']}")
+    elif result["cached"]:
+        st.success(f"✅ Loaded cached model: {result['model_path']}")
+    else:
+        st.success(f"✅ Model saved: {result['model_path']}")
+        fit_stats = result["fit_stats"]
+        st.caption(
+            f"Fit: {fit_stats.get('fit_seconds', 0):.2f}s wall, "
+            f"{fit_stats.get('cpu_seconds', 0):.2f}s CPU, "
+            f"peak RSS {fit_stats.get('peak_rss_mb') or 0:.0f} MB "
+            f"({fit_stats.get('peak_rss_delta_mb') or 0:+.0f} MB during the fit)"
+        )
 
-    # Forecast future
-    last_row = X.iloc[-1].values
-    future_prices = forecast_next_days(model, last_row, days=forecast_days)
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Model", chosen_model)
+    c2.metric("MAE", f"{result['mae']:.4f}")
+    c3.metric("RMSE", f"{result['rmse']:.4f}")
 
-    future_df = pd.DataFrame({
-        "Day": [f"Day {i+1}" for i in range(forecast_days)],
-        "Predicted Close": future_prices
-    })
+    shown = slice_forecast(result, forecast_days)
+    future_df = shown["future_df"]
+    future_prices = shown["future_prices"]
 
     st.subheader(f"📌 Next {forecast_days}-day Forecast")
     st.dataframe(future_df, use_container_width=True)
     st.success(f"✅ Tomorrow predicted close: **{future_prices[0]:.2f}**")
 
-    # ✅ Forecast CSV
-    st.download_button(
-        "⬇️ Download Forecast CSV",
-        data=future_df.to_csv(index=False).encode("utf-8"),
-        file_name=f"{symbol}_forecast.csv",
-        mime="text/csv"
-    )
+    # ✅ Exports are built when their button is pressed
+    fmt, mime = export_format, EXPORT_FORMATS[export_format]
+    download(f"⬇️ Download Forecast ({fmt})", "forecast_export", f"{symbol}_forecast.{fmt}", mime)
+    download(f"⬇️ Download Report, last 200 bars ({fmt})", "report_export", f"{symbol}_report.{fmt}", mime)
+    download(f"⬇️ Download Full History ({fmt})", "history_export", f"{symbol}_history.{fmt}", mime)
+    download("⬇️ Download PDF Report", "pdf", f"{symbol}_report.pdf", "application/pdf")
 
-    # ✅ Full Report CSV (last 200 rows)
-    report_df = df_signals[[
-        "Date", "Open", "High", "Low", "Close",
-        "MA_20", "MA_50", "RSI", "MACD", "MACD_Signal", "Signal"
-    ]].tail(200)
-
-    st.download_button(
-        "⬇️ Download Full Report CSV",
-        data=report_df.to_csv(index=False).encode("utf-8"),
-        file_name=f"{symbol}_full_report.csv",
-        mime="text/csv"
-    )
-
-    # ✅ PDF Export
-    try:
-        pdf_path = create_pdf_report(symbol, future_df, latest["Signal"], sent_avg)
-        with open(pdf_path, "rb") as f:
-            st.download_button(
-                "⬇️ Download PDF Report",
-                data=f,
-                file_name=f"{symbol}_report.pdf",
-                mime="application/pdf"
-            )
-    except Exception as e:
-        st.warning("⚠️ PDF export failed (font/unicode issue). CSV export still works ✅")
-        st.exception(e)
 
+# VIEW - Signals
+elif view == "📌 Signals":
+    from src.signals import label_signals, signal_label
 
-# TAB 3 - Signals
-with tab3:
+    df_signals = graph.get("signals")
+    latest = df_signals.iloc[-1]
     st.subheader("📌 Buy / Sell Signal")
 
     col1, col2, col3 = st.columns(3)
     col1.metric("Latest Close", f"{latest['Close']:.2f}")
     col2.metric("RSI", f"{latest['RSI']:.2f}")
-    col3.metric("Signal", latest["Signal"])
+    col3.metric("Signal", signal_label(latest["Signal"]))
 
-    st.markdown("""
-✅ Strategy:
-- **BUY** when RSI < 30 and Close > MA20  
-- **SELL** when RSI > 70 or Close < MA20  
-- Else HOLD
-""")
+    st.markdown(f"✅ Strategy ({strategy}):\n{RULES[strategy][1]}")
 
+    signal_rows = df_signals[["Date", "Close", "RSI", "MA_20", "Signal"]].tail(25)
     st.dataframe(
-        df_signals[["Date", "Close", "RSI", "MA_20", "Signal"]].tail(25),
+        signal_rows.assign(Signal=label_signals(signal_rows["Signal"])),
         use_container_width=True
     )
+
+    # ✅ How the strategy would have done on this history
+    st.subheader("📊 Strategy Backtest")
+    bt = graph.get("backtest")
+
+    b1, b2, b3, b4 = st.columns(4)
+    b1.metric("Total Return", f"{bt['total_return'] * 100:.1f}%")
+    b2.metric("Max Drawdown", f"{bt['max_drawdown'] * 100:.1f}%")
+    b3.metric("Hit Rate", "-" if pd.isna(bt["hit_rate"]) else f"{bt['hit_rate'] * 100:.0f}%")
+    b4.metric("Trades", f"{bt['trades']:.0f}")
+
+    st.line_chart(pd.DataFrame({"Equity": bt["equity"]}, index=df_signals["Date"]))
+
+
+# ---------------- RUN TIMING ----------------
+profile_paths = timer.dump_profile() if profile_this_run else None
+
+with st.expander("⏱ Run timing"):
+    st.dataframe(timer.to_frame(), use_container_width=True)
+    st.caption(f"Stages run for this view: {', '.join(graph.computed) or 'none'}; "
+               f"from the shared cache: {', '.join(graph.shared) or 'none'}")
+    frames = {name: hit[1] for name, hit in graph.results.items() if isinstance(hit[1], pd.DataFrame)}
+    if frames:
+        from src.frames import memory_report
+        st.caption(f"Frames held for {symbol} (MB; signals share the feature columns)")
+        st.dataframe(memory_report(frames).rename(columns={"symbol": "stage"}), use_container_width=True)
+    if profile_paths:
+        st.caption(f"Profile saved: {', '.join(profile_paths.values())}")
+    elif profile_this_run:
+        st.caption("Nothing was profiled: every stage of this view came from the cache")
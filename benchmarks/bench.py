@@ -0,0 +1,187 @@
+"""
+Hot-path benchmarks on synthetic OHLCV data.
+
+    python -m benchmarks.bench --bars 1000 10000 100000 --out benchmarks/baseline.json
+    python -m benchmarks.bench --bars 1000 10000 --compare benchmarks/baseline.json
+    python -m benchmarks.bench --only add_features compute_rsi --bars 1000000
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.indicators import compute_rsi, compute_macd
+from src.features import add_features, prepare_dataset
+from src.signals import generate_signals
+from src.models_ml import get_model
+from src.forecast import forecast_next_days
+from src.charts import candlestick_chart
+from src.report_pdf import render_pdf_report
+
+
+def synthetic_ohlcv(n_bars: int, seed: int = 0, start="2000-01-03", freq="B") -> pd.DataFrame:
+    """
+    Geometric random walk with consistent OHLC (Low <= Open/Close <= High), load_stock_data layout.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    open_ = close * np.exp(rng.normal(0, 0.003, n_bars))
+    spread = np.abs(rng.normal(0, 0.005, n_bars)) * close
+
+    return pd.DataFrame({
+        "Date": pd.date_range(start, periods=n_bars, freq=freq),
+        "Open": open_,
+        "High": np.maximum(open_, close) + spread,
+        "Low": np.minimum(open_, close) - spread,
+        "Close": close,
+        "Adj Close": close,
+        "Volume": rng.integers(100_000, 5_000_000, n_bars),
+    })
+
+
+# ---------------- CASES ----------------
+# name -> (setup(frames) -> state, run(state))
+def _features(frames):
+    return [add_features(df) for df in frames]
+
+
+def _signals(frames):
+    return [generate_signals(df) for df in _features(frames)]
+
+
+def _dataset(frames):
+    return [prepare_dataset(df) for df in _features(frames)]
+
+
+def _fitted(frames, name):
+    return [(get_model(name).fit(X, y), X.iloc[-1].to_numpy()) for X, y, _, _ in _dataset(frames)]
+
+
+CASES = {
+    "add_features": (lambda f: f, lambda s: [add_features(df) for df in s]),
+    "compute_rsi": (lambda f: f, lambda s: [compute_rsi(df) for df in s]),
+    "compute_macd": (lambda f: f, lambda s: [compute_macd(df) for df in s]),
+    "generate_signals": (_features, lambda s: [generate_signals(df) for df in s]),
+    "prepare_dataset": (_features, lambda s: [prepare_dataset(df) for df in s]),
+    "fit_linear_regression": (_dataset, lambda s: [get_model("Linear Regression").fit(X, y) for X, y, _, _ in s]),
+    "fit_random_forest": (_dataset, lambda s: [get_model("Random Forest").fit(X, y) for X, y, _, _ in s]),
+    "forecast_next_days": (
+        lambda f: _fitted(f, "Linear Regression"),
+        lambda s: [forecast_next_days(m, row, days=14) for m, row in s]
+    ),
+    "candlestick_chart": (_signals, lambda s: [candlestick_chart(df).to_json() for df in s]),
+    "create_pdf_report": (
+        lambda f: pd.DataFrame({"Day": [f"Day {i+1}" for i in range(14)], "Predicted Close": np.linspace(100, 110, 14)}),
+        lambda s: render_pdf_report("BENCH", s, "BUY", 0.1)
+    ),
+}
+
+# Too slow to be useful beyond this many bars
+MAX_BARS = {"fit_random_forest": 20_000}
+
+
+def measure(run, state, repeat: int) -> dict:
+    """
+    Best-of-N wall time, plus peak traced allocation from one extra run.
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - t0)
+
+    gc.collect()
+    tracemalloc.start()
+    run(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds": min(times),
+        "median_seconds": float(np.median(times)),
+        "peak_mb": peak / 1024 ** 2,
+    }
+
+
+def run_benchmarks(bars, symbols=1, only=None, repeat=3, log=print) -> dict:
+    results = {}
+    for n in bars:
+        frames = [synthetic_ohlcv(n, seed=i) for i in range(symbols)]
+        for name, (setup, run) in CASES.items():
+            if only and name not in only:
+                continue
+            if n > MAX_BARS.get(name, float("inf")):
+                continue
+
+            key = f"{name}@{n}x{symbols}"
+            state = setup(frames)
+            results[key] = measure(run, state, repeat)
+            log(f"{key:40s} {results[key]['seconds'] * 1000:10.2f} ms  {results[key]['peak_mb']:8.1f} MB")
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.2):
+    """
+    Keys whose time or memory grew by more than `threshold` (0.2 = +20%).
+    """
+    regressions = []
+    for key, cur in current.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        for metric in ("seconds", "peak_mb"):
+            if base[metric] > 0 and cur[metric] > base[metric] * (1 + threshold):
+                regressions.append((key, metric, base[metric], cur[metric]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the data -> features -> model -> forecast path")
+    parser.add_argument("--bars", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--symbols", type=int, default=1)
+    parser.add_argument("--only", nargs="+", choices=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="Write results JSON here")
+    parser.add_argument("--compare", help="Baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.bars, args.symbols, args.only, args.repeat)
+
+    if args.out:
+        payload = {
+            "meta": {
+                "python": sys.version.split()[0],
+                "pandas": pd.__version__,
+                "numpy": np.__version__,
+                "machine": platform.platform(),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": results,
+        }
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+        print(f"Saved {args.out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over +{args.threshold:.0%}:")
+            for key, metric, base, cur in regressions:
+                print(f"  {key} {metric}: {base:.4g} -> {cur:.4g}")
+            return 1
+        print("\nNo regressions ✅")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Cold-start checks for the dashboard, each measured in a fresh interpreter.
+
+    python -m benchmarks.startup                      # import-time report + time to login page
+    python -m benchmarks.startup --max-seconds 2.5    # exit 1 if the login page is slower / pulls heavy deps
+    python -m benchmarks.startup --modules src.pipeline src.sentiment --top 25
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported before a user has logged in
+# (plotly is left out: streamlit imports it itself)
+HEAVY_MODULES = [
+    "sklearn", "xgboost", "tensorflow", "textblob", "nltk", "feedparser",
+    "fpdf", "yfinance", "scipy", "joblib", "pyarrow",
+]
+
+# What a cold worker imports before rendering the login page
+LOGIN_MODULES = ["streamlit", "src.auth"]
+
+_LOGIN_PAGE = """
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=60)
+at.run()
+print(json.dumps({
+    "seconds": time.perf_counter() - t0,
+    "login_rendered": any("Login" in b.label for b in at.sidebar.button),
+    "errors": [str(e.value) for e in at.exception],
+    "heavy_loaded": [m for m in HEAVY if m in sys.modules],
+}))
+"""
+
+
+def import_time_report(modules, top: int = 15):
+    """
+    `python -X importtime -c "import <modules>"` in a fresh process.
+    Returns the `top` slowest imports as (cumulative_ms, self_ms, module) plus the total ms.
+    """
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us) / 1000, int(self_us) / 1000, name.rstrip()))
+
+    # Top-level entries (no indentation) add up to the whole import cost
+    total = sum(cum for cum, _, name in rows if not name.startswith("  "))
+    return sorted(rows, reverse=True)[:top], total
+
+
+def time_to_login(runs: int = 3) -> dict:
+    """
+    Best-of-N wall time from a fresh interpreter to a rendered (logged-out) login page.
+    """
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-c", f"HEAVY = {HEAVY_MODULES!r}\n" + _LOGIN_PAGE],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time report and time-to-login-page check")
+    parser.add_argument("--modules", nargs="+", default=LOGIN_MODULES, help="Modules for the import report")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-seconds", type=float, help="Fail when the login page takes longer than this")
+    args = parser.parse_args(argv)
+
+    rows, total = import_time_report(args.modules, args.top)
+    print(f"Import time for {' '.join(args.modules)}: {total:.0f} ms")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative, self_ms, name in rows:
+        print(f"{cumulative:14.1f} {self_ms:9.1f}  {name}")
+
+    login = time_to_login(args.runs)
+    print(f"\nLogin page: {login['seconds']:.2f}s (best of {args.runs})")
+
+    failures = []
+    if not login["login_rendered"]:
+        failures.append(f"login page did not render: {login['errors']}")
+    if login["heavy_loaded"]:
+        failures.append(f"heavy modules imported before login: {', '.join(login['heavy_loaded'])}")
+    if args.max_seconds is not None and login["seconds"] > args.max_seconds:
+        failures.append(f"login page took {login['seconds']:.2f}s > {args.max_seconds:.2f}s")
+
+    if failures:
+        print("\n" + "\n".join(f"❌ {f}" for f in failures))
+        return 1
+    print("\nStartup OK ✅")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""
+Headless batch scan: load -> features -> signals -> train/forecast for many symbols.
+
+    python scan.py --symbols AAPL MSFT TSLA
+    python scan.py --user ayush --model "Linear Regression" --days 5 --format csv
+    python scan.py --user ayush --history     # plus every symbol's full history, streamed to one file
+    python scan.py --user ayush --pdf         # plus one watchlist PDF, a page per symbol
+    python scan.py --user ayush --sentiment   # plus each symbol's news sentiment (feeds fetched concurrently)
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from src.data_loader import load_many_stock_data
+from src.exports import get_export_store
+from src.frames import memory_report
+from src.models_ml import available_models
+from src.pipeline import AUTO_MODEL, history_chunks, scan_symbol
+from src.signals import DEFAULT_RULE, RULES
+from src.watchlist import get_watchlist
+
+
+def _max_samples(text: str):
+    # "0.5" -> fraction of the rows, "5000" -> row count
+    return float(text) if "." in text else int(text)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Batch forecast scan over many symbols")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--symbols", nargs="+", help="Symbols to scan")
+    src.add_argument("--user", help="Scan this user's watchlist")
+
+    parser.add_argument("--start", default="2018-01-01", help="History start date")
+    parser.add_argument("--model", default="Random Forest", choices=available_models() + [AUTO_MODEL],
+                        help=f"'{AUTO_MODEL}' picks the best model per symbol by walk-forward CV")
+    parser.add_argument("--days", type=int, default=7, help="Forecast horizon")
+    parser.add_argument("--max-samples", type=_max_samples, default=None,
+                        help="Rows per forest tree: a fraction (0.5) or a row count (5000); default all rows")
+    parser.add_argument("--strategy", default=DEFAULT_RULE, choices=list(RULES))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--compact", action="store_true",
+                        help="float32 prices/features, integer volume and a DatetimeIndex (about half the memory)")
+    parser.add_argument("--format", default="parquet", choices=["parquet", "csv"])
+    parser.add_argument("--out", default=None, help="Output file (default exports/scan_<content hash>.<format>)")
+    parser.add_argument("--history", action="store_true",
+                        help="Also export the full signal history of every symbol (exports/history_<content hash>.<format>)")
+    parser.add_argument("--sentiment", action="store_true",
+                        help="Add each symbol's news sentiment (feeds fetched concurrently within a time budget)")
+    parser.add_argument("--pdf", action="store_true",
+                        help="Also export one watchlist PDF with a page per symbol (exports/watchlist_<content hash>.pdf)")
+    return parser.parse_args(argv)
+
+
+def run_scan(symbols, start="2018-01-01", model_name="Random Forest", days=7,
+             strategy=DEFAULT_RULE, workers=None, compact=False, max_samples=None, sentiment=False, log=print):
+    """
+    Returns (results DataFrame, {symbol: error}).
+    Data is fetched once in the parent (batched), the CPU work fans out to a process pool.
+    compact=True loads float32 / uint32 frames with a DatetimeIndex (less memory and IPC).
+    model_name=AUTO_MODEL picks every symbol's model in one select_many pass before the pool forecasts.
+    sentiment=True adds a sentiment column; the news feeds are fetched on threads while the
+    pool trains, and a symbol whose feed fails or misses the budget gets NaN, not an error.
+    """
+    symbols = list(dict.fromkeys(s.strip().upper().replace(" ", "") for s in symbols))
+    workers = max(1, min(workers or os.cpu_count() or 1, len(symbols) or 1))
+
+    t0 = time.perf_counter()
+    frames, errors = load_many_stock_data(symbols, start=start, compact=compact, date_index=compact)
+    loaded_mb = memory_report(frames)["mb"].sum()
+    log(f"Loaded {len(frames)}/{len(symbols)} symbols ({loaded_mb:.1f} MB) in {time.perf_counter() - t0:.1f}s")
+
+    selected = {}
+    if model_name == AUTO_MODEL and frames:
+        selected = select_watchlist_models(frames, log)
+
+    news = None
+    if sentiment:
+        from src.sentiment import analyze_many
+
+        news = ThreadPoolExecutor(max_workers=1).submit(analyze_many, list(frames))
+
+    rows = []
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for sym, df in frames.items():
+            model, cv_mae = selected.get(sym, (model_name, None))
+            fut = pool.submit(scan_symbol, sym, df, model, days, strategy, max_samples=max_samples, cv_mae=cv_mae)
+            futures[fut] = sym
+        for fut in as_completed(futures):
+            sym = futures[fut]
+            done += 1
+            try:
+                rows.append(fut.result())
+                log(f"[{done}/{len(futures)}] {sym} ✅")
+            except Exception as e:
+                errors[sym] = str(e)
+                log(f"[{done}/{len(futures)}] {sym} ❌ {e}")
+
+    results = pd.DataFrame(rows)
+    if news is not None:
+        scores, news_errors = news.result()
+        for sym, err in sorted(news_errors.items()):
+            log(f"{sym}: news sentiment unavailable ({err})")
+        if not results.empty:
+            results["sentiment"] = results["symbol"].map({sym: avg for sym, (avg, _) in scores.items()})
+    if not results.empty:
+        results = results.sort_values("symbol").reset_index(drop=True)
+    return results, errors
+
+
+def select_watchlist_models(frames: dict, log=print) -> dict:
+    """
+    --model auto: {symbol: (best model, its CV MAE)} from one select_many pass over the
+    whole watchlist, so every (symbol, candidate, fold) fit shares all the cores.
+    Features come from one vectorized panel pass per trading calendar instead of a loop of
+    add_features calls. Symbols too short to cross-validate are left out and select per symbol.
+    """
+    from src.features import panel_features
+    from src.model_selection import N_SPLITS, select_many
+
+    t0 = time.perf_counter()
+    feature_frames = {sym: f for sym, f in panel_features(frames).items() if len(f) > N_SPLITS + 1}
+    if not feature_frames:
+        return {}
+
+    try:
+        best, board = select_many(feature_frames)
+    except ValueError as e:
+        log(f"Watchlist model selection failed ({e}), selecting per symbol")
+        return {}
+
+    cv_mae = board.groupby("symbol")["mae"].first()
+    log(f"Selected models for {len(best)} symbols in {time.perf_counter() - t0:.1f}s")
+    return {sym: (name, float(cv_mae[sym])) for sym, name in best.items()}
+
+
+def report_items(results: pd.DataFrame, frames: dict) -> list:
+    """
+    Scan rows -> create_watchlist_report items (forecast table, signal, sentiment, last 250 closes).
+    """
+    pred_cols = [c for c in results.columns if c.startswith("pred_day_")]
+    items = []
+    for row in results.to_dict("records"):
+        df = frames.get(row["symbol"])
+        items.append({
+            "symbol": row["symbol"],
+            "forecast_df": pd.DataFrame({
+                "Day": [f"Day {i}" for i in range(1, len(pred_cols) + 1)],
+                "Predicted Close": [row[c] for c in pred_cols],
+            }),
+            "signal_text": row["signal"],
+            "sentiment_score": 0.0 if pd.isna(row.get("sentiment")) else row["sentiment"],
+            "closes": df["Close"].tail(250).to_numpy() if df is not None else None,
+        })
+    return items
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    symbols = args.symbols if args.symbols else get_watchlist(args.user)
+    if not symbols:
+        print("No symbols to scan")
+        return 1
+
+    t0 = time.perf_counter()
+    results, errors = run_scan(
+        symbols, start=args.start, model_name=args.model, days=args.days,
+        strategy=args.strategy, workers=args.workers, compact=args.compact, max_samples=args.max_samples,
+        sentiment=args.sentiment or args.pdf
+    )
+
+    exports = get_export_store()
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        if args.format == "parquet":
+            results.to_parquet(args.out, index=False)
+        else:
+            results.to_csv(args.out, index=False)
+        out = args.out
+    else:
+        # ✅ Same results as an earlier scan -> same file, nothing rewritten
+        out = exports.write_frame("scan", results, args.format)
+
+    if args.history and not results.empty:
+        chunks = history_chunks(results["symbol"], args.start, args.strategy, args.compact)
+        history = exports.write_chunks("history", chunks, args.format)
+        print(f"Full history -> {history}")
+
+    if args.pdf and not results.empty:
+        from src.report_pdf import export_watchlist_report
+
+        frames, _ = load_many_stock_data(list(results["symbol"]), start=args.start)
+        # ✅ Pages drawn across the worker processes, one PDF out
+        pdf = export_watchlist_report(report_items(results, frames), workers=args.workers)
+        print(f"Watchlist PDF -> {pdf}")
+
+    print(f"\nScanned {len(results)} symbols in {time.perf_counter() - t0:.1f}s -> {out}")
+    if not results.empty:
+        print(f"Memory per symbol: {results['bars_mb'].mean():.2f} MB bars + {results['features_mb'].mean():.2f} MB features "
+              f"(largest {results['symbol'][results['features_mb'].idxmax()]}: {results['features_mb'].max():.2f} MB)")
+    if errors:
+        print(f"{len(errors)} failed:")
+        for sym, err in sorted(errors.items()):
+            print(f"  {sym}: {err}")
+    return 0 if not errors else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,36 +1,17 @@
 import streamlit as st
-import hashlib
-from src.utils import read_json, write_json
-
-USERS_FILE = "data/users.json"
+from src import db
+from src.db import hash_password
 
 ADMIN_USERNAME = "admin"
 
 
-# ---------------- PASSWORD HELPERS ----------------
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
-
-
-def is_hashed(value: str) -> bool:
-    # SHA256 hash length = 64
-    return isinstance(value, str) and len(value) == 64
-
-
 def migrate_plaintext_to_hash():
     """
-    If users.json has plain text passwords, convert them to hashes automatically.
+    One-time startup step: create the user database and import users.json /
+    watchlist.json into it, hashing any plain text passwords on the way.
+    Later calls in the same process return immediately.
     """
-    users = read_json(USERS_FILE, {})
-    changed = False
-
-    for u, p in list(users.items()):
-        if not is_hashed(p):  # plain password -> hash
-            users[u] = hash_password(p)
-            changed = True
-
-    if changed:
-        write_json(USERS_FILE, users)
+    db.init_db()
 
 
 # ---------------- SIGNUP ----------------
@@ -60,15 +41,11 @@ def signup_ui():
             st.sidebar.error("❌ Passwords do not match")
             return
 
-        users = read_json(USERS_FILE, {})
-
-        if new_user in users:
+        # ✅ Atomic insert, no lost updates between concurrent sign ups
+        if not db.create_user(new_user, hash_password(new_pass)):
             st.sidebar.error("❌ Username already exists")
             return
 
-        users[new_user] = hash_password(new_pass)
-        write_json(USERS_FILE, users)
-
         st.sidebar.success("✅ Account created! Now login below 👇")
 
 
@@ -79,12 +56,10 @@ def login_ui():
     username = st.sidebar.text_input("Username", key="login_user")
     password = st.sidebar.text_input("Password", type="password", key="login_pass")
 
-    users = read_json(USERS_FILE, {})
-
     if st.sidebar.button("Login 🚀"):
         username = username.strip()
 
-        if username in users and users[username] == hash_password(password):
+        if db.get_password_hash(username) == hash_password(password):
             st.session_state["logged_in"] = True
             st.session_state["username"] = username
             st.sidebar.success("✅ Logged in!")
@@ -106,13 +81,11 @@ def forgot_password_ui():
     if st.sidebar.button("Reset Password 🔧"):
         user = user.strip()
 
-        users = read_json(USERS_FILE, {})
-
         if user == "":
             st.sidebar.error("❌ Enter username")
             return
 
-        if user not in users:
+        if not db.user_exists(user):
             st.sidebar.error("❌ User not found")
             return
 
@@ -124,8 +97,7 @@ def forgot_password_ui():
             st.sidebar.error("❌ Passwords do not match")
             return
 
-        users[user] = hash_password(new_pass)
-        write_json(USERS_FILE, users)
+        db.set_password_hash(user, hash_password(new_pass))
         st.sidebar.success("✅ Password reset successful! Now login ✅")
 
 
@@ -141,12 +113,11 @@ def admin_panel_ui():
     st.sidebar.markdown("---")
     st.sidebar.subheader("🛠 Admin Panel")
 
-    users = read_json(USERS_FILE, {})
+    user_list = db.list_users()
 
-    st.sidebar.info(f"👥 Total Registered Users: {len(users)}")
+    st.sidebar.info(f"👥 Total Registered Users: {len(user_list)}")
 
     # User list
-    user_list = sorted(list(users.keys()))
     if ADMIN_USERNAME in user_list:
         user_list.remove(ADMIN_USERNAME)
 
@@ -160,10 +131,8 @@ def admin_panel_ui():
 
     # Delete user
     if st.sidebar.button("❌ Delete User"):
-        users = read_json(USERS_FILE, {})
-        if selected_user in users:
-            del users[selected_user]
-            write_json(USERS_FILE, users)
+        if db.user_exists(selected_user):
+            db.delete_user(selected_user)
             st.sidebar.success(f"✅ Deleted user: {selected_user}")
             st.rerun()
 
@@ -175,15 +144,13 @@ def admin_panel_ui():
             st.sidebar.error("❌ Password must be at least 4 characters")
             return
 
-        users = read_json(USERS_FILE, {})
-        users[selected_user] = hash_password(new_admin_reset)
-        write_json(USERS_FILE, users)
+        db.set_password_hash(selected_user, hash_password(new_admin_reset))
         st.sidebar.success(f"✅ Password reset for {selected_user}")
 
 
 # ---------------- MAIN AUTH FLOW ----------------
 def require_login():
-    # Auto-fix old plain passwords into hashed
+    # One-time JSON import + plain password hashing (no-op after the first run)
     migrate_plaintext_to_hash()
 
     if "logged_in" not in st.session_state:
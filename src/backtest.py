@@ -0,0 +1,188 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+
+# ---------------- SIGNALS -> POSITIONS ----------------
+def signal_codes(signal) -> np.ndarray:
+    """
+    +1 BUY, -1 SELL, 0 HOLD as int8. Accepts the Signal column (labels) or numeric codes.
+    """
+    values = np.asarray(signal)
+    if values.dtype.kind in "iufb":
+        return np.sign(values).astype(np.int8)
+
+    text = pd.Series(values, dtype="object").astype(str)
+    return np.select(
+        [text.str.startswith("BUY").to_numpy(), text.str.startswith("SELL").to_numpy()],
+        [1, -1],
+        0
+    ).astype(np.int8)
+
+
+def positions_from_codes(codes: np.ndarray) -> np.ndarray:
+    """
+    Long after a BUY until the next SELL (HOLD keeps the previous state).
+    Works on (time,) or (time, strategies) arrays without a Python loop:
+    forward-fill the index of the last non-HOLD bar and read its code.
+    """
+    codes = np.asarray(codes)
+    flat = codes.ndim == 1
+    if flat:
+        codes = codes[:, np.newaxis]
+
+    T = codes.shape[0]
+    last_event = np.where(codes != 0, np.arange(T)[:, np.newaxis], 0)
+    np.maximum.accumulate(last_event, axis=0, out=last_event)
+    state = np.take_along_axis(codes, last_event, axis=0)
+    pos = (state == 1).astype(np.float64)
+
+    return pos[:, 0] if flat else pos
+
+
+# ---------------- CORE ----------------
+def _strategy_returns(close: np.ndarray, pos: np.ndarray, cost: float) -> np.ndarray:
+    # Position decided on bar t earns bar t+1's return; cost charged per unit traded
+    asset_ret = np.zeros(close.shape[0])
+    asset_ret[1:] = close[1:] / close[:-1] - 1.0
+
+    held = np.zeros_like(pos)
+    held[1:] = pos[:-1]
+    traded = np.abs(np.diff(pos, axis=0, prepend=0.0))
+    return held * asset_ret[:, np.newaxis] - cost * traded, held, traded
+
+
+def _metrics(strat_ret: np.ndarray, held: np.ndarray, traded: np.ndarray, periods_per_year: int) -> dict:
+    # All arrays are (time, strategies); returns one value per strategy
+    T = strat_ret.shape[0]
+    equity = np.cumprod(1.0 + strat_ret, axis=0)
+    peak = np.maximum.accumulate(equity, axis=0)
+    drawdown = equity / peak - 1.0
+
+    mean = strat_ret.mean(axis=0)
+    std = strat_ret.std(axis=0, ddof=1) if T > 1 else np.zeros(strat_ret.shape[1])
+    in_market = (held > 0).sum(axis=0)
+    wins = ((strat_ret > 0) & (held > 0)).sum(axis=0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(periods_per_year), 0.0)
+        hit_rate = np.where(in_market > 0, wins / in_market, np.nan)
+
+    return {
+        "total_return": equity[-1] - 1.0,
+        "cagr": equity[-1] ** (periods_per_year / max(T, 1)) - 1.0,
+        "sharpe": sharpe,
+        "max_drawdown": drawdown.min(axis=0),
+        "hit_rate": hit_rate,
+        "exposure": in_market / T,
+        "trades": traded.sum(axis=0),
+        "turnover": traded.sum(axis=0) * periods_per_year / T,
+    }
+
+
+def backtest(close, signal=None, positions=None, cost: float = 0.0, periods_per_year: int = TRADING_DAYS) -> dict:
+    """
+    Vectorized long/flat backtest of one strategy.
+    Pass either the Signal column (BUY/SELL/HOLD) or a boolean/0-1 position array.
+    Returns metrics plus per-bar returns, equity, drawdown and positions.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if positions is None:
+        pos = positions_from_codes(signal_codes(signal))
+    else:
+        pos = np.asarray(positions, dtype=np.float64)
+
+    strat_ret, held, traded = _strategy_returns(close, pos[:, np.newaxis], cost)
+    metrics = {k: float(v[0]) for k, v in _metrics(strat_ret, held, traded, periods_per_year).items()}
+
+    equity = np.cumprod(1.0 + strat_ret[:, 0])
+    metrics.update({
+        "returns": strat_ret[:, 0],
+        "equity": equity,
+        "drawdown": equity / np.maximum.accumulate(equity) - 1.0,
+        "positions": pos,
+    })
+    return metrics
+
+
+# ---------------- PARAMETER GRID ----------------
+def param_grid(buy_rsi=(30,), sell_rsi=(70,), ma_window=(20,)) -> pd.DataFrame:
+    return pd.DataFrame(
+        list(itertools.product(buy_rsi, sell_rsi, ma_window)),
+        columns=["buy_rsi", "sell_rsi", "ma_window"]
+    )
+
+
+def grid_returns(df: pd.DataFrame, grid: pd.DataFrame, cost: float = 0.0):
+    """
+    Strategy returns for every grid row at once: (time, len(grid)) matrices.
+    Rule (same as generate_signals): BUY when RSI < buy_rsi and Close > MA,
+    SELL when RSI > sell_rsi or Close < MA, SELL wins ties.
+    """
+    close = df["Close"].to_numpy(dtype=np.float64)
+    rsi = df["RSI"].to_numpy(dtype=np.float64)[:, np.newaxis]
+
+    windows = np.unique(grid["ma_window"].to_numpy())
+    ma_by_window = {w: pd.Series(close).rolling(int(w)).mean().to_numpy() for w in windows}
+    ma = np.column_stack([ma_by_window[w] for w in grid["ma_window"].to_numpy()])
+
+    above = close[:, np.newaxis] > ma
+    below = close[:, np.newaxis] < ma
+    buy = (rsi < grid["buy_rsi"].to_numpy()[np.newaxis, :]) & above
+    sell = (rsi > grid["sell_rsi"].to_numpy()[np.newaxis, :]) | below
+
+    codes = np.where(sell, -1, np.where(buy, 1, 0)).astype(np.int8)
+    pos = positions_from_codes(codes)
+    return _strategy_returns(close, pos, cost)
+
+
+def sweep(df: pd.DataFrame, grid: pd.DataFrame, cost: float = 0.0, periods_per_year: int = TRADING_DAYS) -> pd.DataFrame:
+    """
+    Backtest every parameter combination; one metrics row per grid row.
+    """
+    strat_ret, held, traded = grid_returns(df, grid, cost)
+    metrics = _metrics(strat_ret, held, traded, periods_per_year)
+    return pd.concat([grid.reset_index(drop=True), pd.DataFrame(metrics)], axis=1)
+
+
+def walk_forward(df: pd.DataFrame, grid: pd.DataFrame, train_bars: int = 756, test_bars: int = 126,
+                 metric: str = "sharpe", cost: float = 0.0, periods_per_year: int = TRADING_DAYS):
+    """
+    Pick the best grid row on each training window, trade it on the following test window.
+    Returns (folds, oos) where folds lists the chosen params per window and
+    oos holds the stitched out-of-sample metrics and equity.
+    """
+    strat_ret, held, traded = grid_returns(df, grid, cost)
+    T = strat_ret.shape[0]
+
+    folds, oos_ret, oos_held, oos_traded = [], [], [], []
+    for start in range(0, T - train_bars - test_bars + 1, test_bars):
+        train = slice(start, start + train_bars)
+        test = slice(start + train_bars, start + train_bars + test_bars)
+
+        scores = _metrics(strat_ret[train], held[train], traded[train], periods_per_year)[metric]
+        best = int(np.nanargmax(scores))
+
+        folds.append({
+            "train_start": start,
+            "test_start": test.start,
+            "test_end": test.stop,
+            **grid.iloc[best].to_dict(),
+            f"train_{metric}": float(scores[best]),
+        })
+        oos_ret.append(strat_ret[test, best])
+        oos_held.append(held[test, best])
+        oos_traded.append(traded[test, best])
+
+    if not folds:
+        raise ValueError("History too short for the requested train/test windows")
+
+    r = np.concatenate(oos_ret)[:, np.newaxis]
+    oos = {k: float(v[0]) for k, v in _metrics(
+        r, np.concatenate(oos_held)[:, np.newaxis], np.concatenate(oos_traded)[:, np.newaxis], periods_per_year
+    ).items()}
+    oos["equity"] = np.cumprod(1.0 + r[:, 0])
+    return pd.DataFrame(folds), oos
@@ -0,0 +1,135 @@
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+import numpy as np
+import pandas as pd
+
+MAX_ENTRIES = 128
+MAX_BYTES = 1024 ** 3
+
+
+def stage_key(*parts) -> str:
+    """
+    Stable short key from any mix of str/int/float/date/tuple parts.
+    Downstream stages include the upstream key, so a change upstream
+    automatically misses everything below it.
+    """
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def data_version(df: pd.DataFrame) -> str:
+    """
+    Cheap identity of a loaded frame: row count, first/last bar and last row values.
+    """
+    if df.empty:
+        return stage_key("empty")
+    first, last = df.iloc[0], df.iloc[-1]
+    return stage_key(len(df), tuple(df.columns), tuple(first.astype(str)), tuple(last.astype(str)))
+
+
+def time_bucket(seconds: int) -> int:
+    # Same value for every call inside one window, used to expire time-based stages
+    return int(time.time() // seconds)
+
+
+def approx_size(value) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=False))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(approx_size(v) for v in value)
+    if isinstance(value, dict):
+        return sum(approx_size(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+class StageCache:
+    """
+    LRU memo for pipeline stages, bounded by entry count and approximate bytes.
+    Shared across sessions; concurrent callers of the same key wait for one compute.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()  # (stage, key) -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+
+    def _key_lock(self, k) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(k, threading.Lock())
+
+    def get(self, stage: str, key: str, default=None):
+        k = (stage, key)
+        with self._lock:
+            if k in self._data:
+                self._data.move_to_end(k)
+                return self._data[k][0]
+        return default
+
+    def put(self, stage: str, key: str, value):
+        k = (stage, key)
+        size = approx_size(value)
+        with self._lock:
+            if k in self._data:
+                self._bytes -= self._data.pop(k)[1]
+            self._data[k] = (value, size)
+            self._bytes += size
+
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                old, (_, old_size) = self._data.popitem(last=False)
+                self._bytes -= old_size
+                self._key_locks.pop(old, None)
+
+    def get_or_compute(self, stage: str, key: str, fn):
+        k = (stage, key)
+        with self._lock:
+            if k in self._data:
+                self._data.move_to_end(k)
+                self.hits[stage] += 1
+                return self._data[k][0]
+
+        with self._key_lock(k):
+            # Another session may have filled it while we waited
+            with self._lock:
+                if k in self._data:
+                    self._data.move_to_end(k)
+                    self.hits[stage] += 1
+                    return self._data[k][0]
+                self.misses[stage] += 1
+
+            value = fn()
+            self.put(stage, key, value)
+            return value
+
+    def invalidate(self, stage: str = None):
+        with self._lock:
+            for k in [k for k in self._data if stage is None or k[0] == stage]:
+                self._bytes -= self._data.pop(k)[1]
+
+    def stats(self) -> pd.DataFrame:
+        stages = sorted(set(self.hits) | set(self.misses))
+        return pd.DataFrame({
+            "stage": stages,
+            "hits": [self.hits[s] for s in stages],
+            "misses": [self.misses[s] for s in stages],
+        })
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self):
+        return len(self._data)
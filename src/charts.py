@@ -1,7 +1,33 @@
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
-def candlestick_chart(df):
+from src.resample import auto_resample, downsample_line
+
+# ✅ Bounded payload: at most this many candles / points per line
+MAX_CANDLES = 600
+MAX_LINE_POINTS = 1500
+
+# Switch line traces to WebGL beyond this many source bars
+WEBGL_THRESHOLD = 5000
+
+def candlestick_chart(df, max_candles=MAX_CANDLES, max_points=MAX_LINE_POINTS, webgl=None):
+    """
+    Long histories are aggregated to weekly/monthly candles and the indicator lines
+    are LTTB-downsampled, so the figure size does not grow with the history.
+    Pass max_candles/max_points=None to plot every bar.
+    """
+    if webgl is None:
+        webgl = len(df) > WEBGL_THRESHOLD
+    Line = go.Scattergl if webgl else go.Scatter
+
+    candles, period = (df, None) if max_candles is None else auto_resample(df, max_candles)
+
+    def line(col, name):
+        if max_points is None:
+            return Line(x=df["Date"], y=df[col], name=name)
+        x, y = downsample_line(df["Date"], df[col], max_points)
+        return Line(x=x, y=y, name=name)
+
     fig = make_subplots(
         rows=3, cols=1,
         shared_xaxes=True,
@@ -11,23 +37,23 @@ def candlestick_chart(df):
 
     fig.add_trace(
         go.Candlestick(
-            x=df["Date"],
-            open=df["Open"],
-            high=df["High"],
-            low=df["Low"],
-            close=df["Close"],
-            name="Candlestick"
+            x=candles["Date"],
+            open=candles["Open"],
+            high=candles["High"],
+            low=candles["Low"],
+            close=candles["Close"],
+            name="Candlestick" if period is None else f"Candlestick ({period})"
         ),
         row=1, col=1
     )
 
-    fig.add_trace(go.Scatter(x=df["Date"], y=df["MA_20"], name="MA 20"), row=1, col=1)
-    fig.add_trace(go.Scatter(x=df["Date"], y=df["MA_50"], name="MA 50"), row=1, col=1)
+    fig.add_trace(line("MA_20", "MA 20"), row=1, col=1)
+    fig.add_trace(line("MA_50", "MA 50"), row=1, col=1)
 
-    fig.add_trace(go.Scatter(x=df["Date"], y=df["RSI"], name="RSI"), row=2, col=1)
+    fig.add_trace(line("RSI", "RSI"), row=2, col=1)
 
-    fig.add_trace(go.Scatter(x=df["Date"], y=df["MACD"], name="MACD"), row=3, col=1)
-    fig.add_trace(go.Scatter(x=df["Date"], y=df["MACD_Signal"], name="Signal"), row=3, col=1)
+    fig.add_trace(line("MACD", "MACD"), row=3, col=1)
+    fig.add_trace(line("MACD_Signal", "Signal"), row=3, col=1)
 
     fig.update_layout(height=800, xaxis_rangeslider_visible=False)
     return fig
@@ -1,24 +1,37 @@
-import yfinance as yf
 import pandas as pd
+from src.frames import compact_bars
+from src.store import get_store
 
-def load_stock_data(symbol: str, start="2018-01-01", end=None) -> pd.DataFrame:
-    symbol = symbol.strip().upper().replace(" ", "")
-
-    df = yf.download(symbol, start=start, end=end, progress=False)
-
-    # ✅ Fix MultiIndex columns
-    if not df.empty and isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
+def _shape(df: pd.DataFrame, compact: bool, date_index: bool) -> pd.DataFrame:
+    if compact:
+        df = compact_bars(df)
+    return df if date_index else df.reset_index()
 
-    # ✅ Retry with 1 year data if empty
-    if df.empty:
-        df = yf.download(symbol, period="1y", progress=False)
+def load_stock_data(symbol: str, start="2018-01-01", end=None, store=None, interval="1d",
+                    compact=False, date_index=False) -> pd.DataFrame:
+    """
+    interval: 1d (default) or intraday bars like 1m / 5m / 15m / 1h / 4h.
+    Intervals that are not downloaded directly are resampled from stored finer bars.
+    compact: float32 prices + uint32/int64 Volume. date_index: keep the DatetimeIndex
+    instead of a Date column.
+    """
+    symbol = symbol.strip().upper().replace(" ", "")
 
-        if not df.empty and isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
+    # ✅ Served from the local OHLCV store, only missing bars are downloaded
+    store = store or get_store()
+    df = store.load(symbol, start=start, end=end, interval=interval)
 
     if df.empty:
         raise ValueError(f"No data found for symbol: {symbol}")
 
-    df.reset_index(inplace=True)
-    return df
+    return _shape(df, compact, date_index)
+
+def load_many_stock_data(symbols, start="2018-01-01", end=None, store=None, interval="1d",
+                         compact=False, date_index=False):
+    """
+    Batch version of load_stock_data for a whole watchlist.
+    Returns ({symbol: df}, {symbol: error message}).
+    """
+    store = store or get_store()
+    frames, errors = store.load_many(symbols, start=start, end=end, interval=interval)
+    return {sym: _shape(df, compact, date_index) for sym, df in frames.items()}, errors
@@ -0,0 +1,213 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+from src.utils import read_json
+
+DB_PATH = "data/app.db"
+
+# Legacy JSON files, imported once into the database
+USERS_JSON = "data/users.json"
+WATCHLIST_JSON = "data/watchlist.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS watchlist (
+    username TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (username, symbol)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    job_key TEXT PRIMARY KEY,
+    job_group TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    label TEXT,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    error TEXT,
+    result_path TEXT,
+    expected_seconds REAL,
+    owner TEXT,
+    submitted_by TEXT,
+    submitted_at REAL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, job_group);
+"""
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()
+
+
+def get_conn(path: str = None) -> sqlite3.Connection:
+    """
+    One connection per thread (sqlite connections are not thread safe).
+    WAL lets readers run while one writer commits.
+    """
+    path = path or DB_PATH
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+
+    conn = conns.get(path)
+    if conn is None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conns[path] = conn
+    return conn
+
+
+class transaction:
+    """
+    with transaction() as conn: ... -> BEGIN IMMEDIATE / COMMIT, ROLLBACK on error.
+    """
+
+    def __init__(self, path: str = None):
+        self.conn = get_conn(path)
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def init_db(path: str = None):
+    """
+    Create tables and import the legacy JSON files once per database.
+    Safe to call on every rerun: after the first call per process it is a set lookup.
+    """
+    path = path or DB_PATH
+    if path in _initialized:
+        return
+
+    with _init_lock:
+        if path in _initialized:
+            return
+
+        get_conn(path).executescript(SCHEMA)
+
+        with transaction(path) as conn:
+            done = conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone()
+            if not done:
+                _import_json(conn)
+                conn.execute("INSERT INTO meta (key, value) VALUES ('json_imported', '1')")
+
+        _initialized.add(path)
+
+
+# ---------------- PASSWORD HELPERS ----------------
+def hash_password(password: str) -> str:
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def is_hashed(value: str) -> bool:
+    # SHA256 hash length = 64
+    return isinstance(value, str) and len(value) == 64
+
+
+def _import_json(conn):
+    users = read_json(USERS_JSON, {})
+    for username, password in users.items():
+        # ✅ Old plain text passwords get hashed on the way in
+        if not is_hashed(password):
+            password = hash_password(password)
+        conn.execute(
+            "INSERT OR IGNORE INTO users (username, password_hash) VALUES (?, ?)",
+            (username, password)
+        )
+
+    watchlists = read_json(WATCHLIST_JSON, {})
+    for username, symbols in watchlists.items():
+        for pos, symbol in enumerate(symbols):
+            conn.execute(
+                "INSERT OR IGNORE INTO watchlist (username, symbol, position) VALUES (?, ?, ?)",
+                (username, symbol, pos)
+            )
+
+
+# ---------------- USERS ----------------
+def get_password_hash(username: str):
+    row = get_conn().execute("SELECT password_hash FROM users WHERE username = ?", (username,)).fetchone()
+    return row[0] if row else None
+
+
+def user_exists(username: str) -> bool:
+    return get_password_hash(username) is not None
+
+
+def create_user(username: str, password_hash: str) -> bool:
+    """
+    Atomic insert; False if the username is taken.
+    """
+    cur = get_conn().execute(
+        "INSERT OR IGNORE INTO users (username, password_hash) VALUES (?, ?)",
+        (username, password_hash)
+    )
+    return cur.rowcount == 1
+
+
+def set_password_hash(username: str, password_hash: str) -> bool:
+    cur = get_conn().execute(
+        "UPDATE users SET password_hash = ? WHERE username = ?",
+        (password_hash, username)
+    )
+    return cur.rowcount == 1
+
+
+def delete_user(username: str):
+    with transaction() as conn:
+        conn.execute("DELETE FROM users WHERE username = ?", (username,))
+        conn.execute("DELETE FROM watchlist WHERE username = ?", (username,))
+
+
+def list_users():
+    return [r[0] for r in get_conn().execute("SELECT username FROM users ORDER BY username")]
+
+
+def count_users() -> int:
+    return get_conn().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+
+# ---------------- WATCHLIST ----------------
+def get_symbols(username: str):
+    rows = get_conn().execute(
+        "SELECT symbol FROM watchlist WHERE username = ? ORDER BY position",
+        (username,)
+    )
+    return [r[0] for r in rows]
+
+
+def add_symbol(username: str, symbol: str):
+    # Appends at the end in one statement, duplicates ignored
+    get_conn().execute(
+        """
+        INSERT OR IGNORE INTO watchlist (username, symbol, position)
+        SELECT ?, ?, COALESCE(MAX(position), -1) + 1 FROM watchlist WHERE username = ?
+        """,
+        (username, symbol, username)
+    )
+
+
+def remove_symbol(username: str, symbol: str):
+    get_conn().execute(
+        "DELETE FROM watchlist WHERE username = ? AND symbol = ?",
+        (username, symbol)
+    )
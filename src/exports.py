@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+EXPORTS_DIR = "exports"
+
+# Download format -> mime type
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Retention for files in EXPORTS_DIR (subdirectories such as profiles/ are left alone):
+# older than RETENTION_DAYS, then least-recently-written beyond MAX_BYTES
+RETENTION_DAYS = 30
+MAX_BYTES = 1024 ** 3
+TMP_MAX_AGE_SECONDS = 3600
+
+# Rows per CSV write / Parquet row group when streaming to disk
+CHUNK_ROWS = 100_000
+
+
+def frame_digest(df: pd.DataFrame, fmt: str = "") -> str:
+    """
+    Content hash of a frame (values, index, column names and dtypes) plus the output format.
+    Cheaper than encoding, so an identical export is found before it is rendered again.
+    """
+    h = hashlib.sha256(fmt.encode())
+    h.update(json.dumps([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return h.hexdigest()[:16]
+
+
+def _write_parquet(chunks, path: str, hasher=None):
+    """
+    Stream frames into one Parquet file, one row group per CHUNK_ROWS slice.
+    Every chunk is cast to the first chunk's schema.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer, schema = None, None
+    try:
+        for chunk in chunks:
+            for start in range(0, max(len(chunk), 1), CHUNK_ROWS):
+                part = chunk.iloc[start:start + CHUNK_ROWS]
+                if hasher is not None:
+                    hasher.update(pd.util.hash_pandas_object(part, index=False).values.tobytes())
+                table = pa.Table.from_pandas(part, schema=schema, preserve_index=False)
+                if writer is None:
+                    schema = table.schema
+                    writer = pq.ParquetWriter(path, schema)
+                writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    return schema
+
+
+def _write_csv(chunks, path: str, hasher=None):
+    header = True
+    columns = None
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for chunk in chunks:
+            if hasher is not None:
+                hasher.update(pd.util.hash_pandas_object(chunk, index=False).values.tobytes())
+            chunk.to_csv(f, index=False, header=header, chunksize=CHUNK_ROWS)
+            if header:
+                columns = list(chunk.columns)
+            header = False
+    return columns
+
+
+_WRITERS = {"parquet": _write_parquet, "csv": _write_csv}
+
+
+class ExportStore:
+    """
+    Content-addressed exports: {root}/{name}_{digest}.{ext}.
+    Writing something that already exists only refreshes its mtime, so identical
+    reports, forecasts and scans are rendered and written once.
+    """
+
+    def __init__(self, root: str = EXPORTS_DIR, retention_days: float = RETENTION_DAYS, max_bytes: int = MAX_BYTES):
+        self.root = root
+        self.retention_seconds = retention_days * 24 * 3600
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path(self, name: str, digest: str, ext: str) -> str:
+        return os.path.join(self.root, f"{name.replace(' ', '_')}_{digest}.{ext}")
+
+    def _hit(self, path: str) -> bool:
+        if not os.path.exists(path):
+            return False
+        os.utime(path)  # recently produced again: keep it under the retention policy
+        return True
+
+    def _tmp(self, ext: str) -> str:
+        os.makedirs(self.root, exist_ok=True)
+        return os.path.join(self.root, f".{uuid.uuid4().hex}.{ext}.tmp")
+
+    def _publish(self, tmp: str, path: str) -> str:
+        if os.path.exists(path):
+            os.remove(tmp)
+            os.utime(path)
+        else:
+            os.replace(tmp, path)
+        self.enforce_retention()
+        return path
+
+    def write_frame(self, name: str, df: pd.DataFrame, fmt: str = "parquet") -> str:
+        """
+        Export one frame, skipped entirely when the same content was exported before.
+        """
+        if fmt not in _WRITERS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        path = self.path(name, frame_digest(df, fmt), fmt)
+        if self._hit(path):
+            return path
+
+        tmp = self._tmp(fmt)
+        try:
+            _WRITERS[fmt]([df], tmp)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return self._publish(tmp, path)
+
+    def write_chunks(self, name: str, chunks, fmt: str = "parquet") -> str:
+        """
+        Stream an iterable of frames (e.g. one per symbol) into one file without holding
+        them all in memory. The digest is computed while writing; a duplicate is discarded.
+        """
+        if fmt not in _WRITERS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        hasher = hashlib.sha256(fmt.encode())
+        tmp = self._tmp(fmt)
+        try:
+            layout = _WRITERS[fmt](chunks, tmp, hasher)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        if layout is None:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise ValueError(f"Nothing to export for {name}")
+        hasher.update(str(layout).encode())
+        return self._publish(tmp, self.path(name, hasher.hexdigest()[:16], fmt))
+
+    def write_bytes(self, name: str, data, ext: str, digest: str = None) -> str:
+        """
+        data: bytes, or a callable rendering them. With `digest` (a hash of the inputs,
+        for outputs like PDFs that embed a timestamp) data is only rendered on a miss.
+        """
+        if digest is None:
+            data = data() if callable(data) else data
+            digest = hashlib.sha256(data).hexdigest()[:16]
+        path = self.path(name, digest, ext)
+        if self._hit(path):
+            return path
+
+        data = data() if callable(data) else data
+
+        tmp = self._tmp(ext)
+        with open(tmp, "wb") as f:
+            f.write(data)
+        return self._publish(tmp, path)
+
+    def export_bytes(self, name: str, df: pd.DataFrame, fmt: str = "csv") -> bytes:
+        # Download payload that is also kept (once) in the exports directory
+        with open(self.write_frame(name, df, fmt), "rb") as f:
+            return f.read()
+
+    def enforce_retention(self) -> list:
+        """
+        Delete exports older than the retention period, then the oldest ones until
+        the directory fits in max_bytes. Returns the removed paths.
+        """
+        if not os.path.isdir(self.root):
+            return []
+
+        with self._lock:
+            now = time.time()
+            entries = []
+            for entry in os.scandir(self.root):
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                if entry.name.endswith(".tmp"):
+                    # Left behind by a crashed writer
+                    if now - stat.st_mtime > TMP_MAX_AGE_SECONDS:
+                        os.remove(entry.path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            entries.sort()
+            total = sum(size for _, size, _ in entries)
+            removed = []
+            for mtime, size, path in entries:
+                if now - mtime <= self.retention_seconds and total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed.append(path)
+            return removed
+
+
+_default_store = None
+
+
+def get_export_store() -> ExportStore:
+    global _default_store
+    if _default_store is None:
+        _default_store = ExportStore()
+    return _default_store
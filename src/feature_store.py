@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from src.features import FEATURE_COLS, FEATURE_PARAMS, add_features, add_features_chunked
+
+FEATURES_DIR = "data/features"
+
+# Data versions kept per series (sessions with different start dates / refreshes each have one)
+MAX_DATA_VERSIONS = 4
+TMP_MAX_AGE_SECONDS = 3600
+
+
+def feature_version() -> str:
+    """
+    Changes whenever indicator parameters or the feature list change.
+    """
+    payload = json.dumps({"params": FEATURE_PARAMS, "cols": FEATURE_COLS}, sort_keys=True, default=list)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def _dir(symbol: str, version: str, root: str, data_version: str = None) -> str:
+    path = os.path.join(root, symbol, version)
+    return path if data_version is None else os.path.join(path, data_version)
+
+
+def _versions(base: str):
+    # Stored data versions, newest first (by last write/read)
+    if not os.path.isdir(base):
+        return []
+    entries = [e for e in os.scandir(base) if e.is_dir() and not e.name.endswith(".tmp")]
+    return [e.path for e in sorted(entries, key=lambda e: e.stat().st_mtime, reverse=True)]
+
+
+def _prune(base: str, keep: int = MAX_DATA_VERSIONS):
+    """
+    Keep the `keep` most recently used data versions of one series; drop temp dirs of
+    crashed writers. Readers that already memory-mapped a removed version keep working.
+    """
+    for path in _versions(base)[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
+    now = time.time()
+    for entry in os.scandir(base):
+        if entry.name.endswith(".tmp") and now - entry.stat().st_mtime > TMP_MAX_AGE_SECONDS:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def save_features(symbol: str, df_feat: pd.DataFrame, data_version: str, root: str = FEATURES_DIR) -> str:
+    """
+    Write the numeric columns of an add_features() frame as one .npy matrix per dtype
+    (values.npy holds FEATURE_COLS first, so training features are a contiguous slice) plus
+    dates, under {root}/{symbol}/{feature version}/{data version}. Columns keep their dtype,
+    so compact float32 / uint32 frames stay half the size.
+    """
+    version = feature_version()
+    path = _dir(symbol, version, root, data_version)
+    # ✅ Private temp dir per writer: concurrent sessions never touch each other's files
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    os.makedirs(tmp)
+
+    try:
+        numeric = [c for c in df_feat.columns if c != "Date" and pd.api.types.is_numeric_dtype(df_feat[c])]
+        columns = list(FEATURE_COLS) + [c for c in numeric if c not in FEATURE_COLS]
+
+        # FEATURE_COLS share one dtype (add_features casts them together); other columns join
+        # that matrix when their dtype matches and get a matrix of their own otherwise
+        groups = {}
+        for col in columns:
+            groups.setdefault(df_feat[col].dtype.str, []).append(col)
+        blocks = []
+        for i, cols in enumerate(groups.values()):
+            name = "values.npy" if i == 0 else f"values_{i}.npy"
+            np.save(os.path.join(tmp, name), df_feat[cols].to_numpy())
+            blocks.append({"file": name, "columns": cols})
+
+        dates = df_feat["Date"] if "Date" in df_feat.columns else df_feat.index
+        np.save(os.path.join(tmp, "dates.npy"), pd.to_datetime(dates).to_numpy(dtype="datetime64[ns]"))
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"columns": columns, "blocks": blocks, "data_version": data_version,
+                       "params": FEATURE_PARAMS}, f, indent=2)
+
+        # One rename publishes the whole directory; the same data version always has the same
+        # content, so if another writer got there first its copy is kept and ours dropped
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            if not os.path.exists(os.path.join(path, "meta.json")):
+                raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    _prune(_dir(symbol, version, root))
+    return path
+
+
+def load_features(symbol: str, data_version: str = None, root: str = FEATURES_DIR):
+    """
+    Memory-mapped feature frame (Date column + numeric columns backed by read-only
+    buffers, one per dtype), or None when nothing matching is stored. data_version=None loads the most
+    recently used version. Every reader in the process shares the same OS page cache pages.
+    """
+    base = _dir(symbol, feature_version(), root)
+    if data_version is None:
+        versions = _versions(base)
+        path = versions[0] if versions else None
+    else:
+        path = _dir(symbol, feature_version(), root, data_version)
+    meta_path = os.path.join(path, "meta.json") if path else None
+    if meta_path is None or not os.path.exists(meta_path):
+        return None
+
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    # Written before per-dtype blocks existed: a single float64 matrix
+    blocks = meta.get("blocks") or [{"file": "values.npy", "columns": meta["columns"]}]
+    parts = [
+        pd.DataFrame(np.load(os.path.join(path, b["file"]), mmap_mode="r"), columns=b["columns"], copy=False)
+        for b in blocks
+    ]
+    dates = np.load(os.path.join(path, "dates.npy"))
+    try:
+        os.utime(path)  # recently used: kept by _prune
+    except OSError:
+        pass
+
+    df = parts[0] if len(parts) == 1 else pd.concat(parts, axis=1)[meta["columns"]]
+    df.insert(0, "Date", pd.DatetimeIndex(dates))
+    return df
+
+
+def get_features(symbol: str, df: pd.DataFrame, data_version: str, root: str = FEATURES_DIR,
+                 interval: str = "1d") -> pd.DataFrame:
+    """
+    Stored feature frame for this exact data version, computing and persisting it on a miss.
+    Intraday histories are computed chunk by chunk so temporaries stay bounded.
+    """
+    cached = load_features(symbol, data_version, root)
+    if cached is not None:
+        return cached
+
+    df_feat = add_features(df) if interval == "1d" else add_features_chunked(df)
+    save_features(symbol, df_feat, data_version, root)
+    stored = load_features(symbol, data_version, root)
+    # Pruned by another writer in between: the frame just computed is still valid
+    return stored if stored is not None else df_feat
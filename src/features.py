@@ -1,36 +1,281 @@
+import numpy as np
 import pandas as pd
-from src.indicators import compute_rsi, compute_macd
+from src.indicators import compute_rsi, compute_macd, is_time_window, rolling
 
-def add_features(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+FEATURE_COLS = [
+    "Close", "MA_10", "MA_20", "MA_50",
+    "Return", "Volatility",
+    "RSI", "MACD", "MACD_Signal", "MACD_Hist"
+]
 
-    df["MA_10"] = df["Close"].rolling(10).mean()
-    df["MA_20"] = df["Close"].rolling(20).mean()
-    df["MA_50"] = df["Close"].rolling(50).mean()
+# Indicator parameters; the feature store versions cached matrices by these.
+# Every window is a bar count (int) or a time span ("30min", "4h", "5D") for intraday bars.
+FEATURE_PARAMS = {
+    "ma_windows": (10, 20, 50),
+    "vol_window": 10,
+    "rsi_period": 14,
+    "macd": (12, 26, 9),
+}
 
-    df["Return"] = df["Close"].pct_change()
-    df["Volatility"] = df["Return"].rolling(10).std()
+# MA_10 / MA_20 / MA_50 are the short / mid / long averages whatever their windows are
+MA_COLS = ("MA_10", "MA_20", "MA_50")
 
-    df["RSI"] = compute_rsi(df)
-    macd, macd_signal, macd_hist = compute_macd(df)
-    df["MACD"] = macd
-    df["MACD_Signal"] = macd_signal
-    df["MACD_Hist"] = macd_hist
+# Rows streamed per chunk by iter_feature_chunks
+CHUNK_ROWS = 250_000
 
-    df = df.dropna()
-    return df
+def _drop_warmup(df: pd.DataFrame) -> pd.DataFrame:
+    # Same rows as dropna(); NaNs are normally only in the warm-up prefix, so that is a slice, not a copy
+    ok = df.notna().all(axis=1).to_numpy()
+    first = int(ok.argmax()) if ok.any() else len(ok)
+    if ok[first:].all():
+        return df.iloc[first:]
+    return df[ok]
+
+def add_features(df: pd.DataFrame, params: dict = None, dtype=None) -> pd.DataFrame:
+    """
+    params overrides entries of FEATURE_PARAMS, e.g. {"ma_windows": ("1h", "4h", "1D")} on 5m bars.
+    Feature columns get `dtype`, by default Close's dtype (float32 for compact_bars() frames).
+    The input frame is not modified and its columns are not copied.
+    """
+    p = {**FEATURE_PARAMS, **(params or {})}
+    dtype = np.dtype(dtype or df["Close"].dtype)
+    windows = list(p["ma_windows"]) + [p["vol_window"], p["rsi_period"]] + list(p["macd"])
+    dates = None
+    if any(is_time_window(w) for w in windows):
+        dates = df["Date"] if "Date" in df.columns else df.index
+
+    close = df["Close"]
+    cols = {}
+    for col, w in zip(MA_COLS, p["ma_windows"]):
+        cols[col] = rolling(close, w, dates)
+
+    cols["Return"] = close.pct_change()
+    cols["Volatility"] = rolling(cols["Return"], p["vol_window"], dates, stat="std")
+
+    cols["RSI"] = compute_rsi(df, period=p["rsi_period"])
+    fast, slow, signal = p["macd"]
+    cols["MACD"], cols["MACD_Signal"], cols["MACD_Hist"] = compute_macd(df, fast=fast, slow=slow, signal=signal)
+
+    # assign() is a shallow copy under copy-on-write: only the new columns are allocated
+    out = df.assign(**{col: s.astype(dtype) for col, s in cols.items()})
+    return _drop_warmup(out)
+
+def _warmup(p: dict):
+    """
+    History each chunk needs from the previous one: (bars, time span).
+    Rolling windows are exact; EMAs get 10 spans to converge (error below 1e-8).
+    """
+    fast, slow, signal = p["macd"]
+    bars, span = 0, pd.Timedelta(0)
+    for w in list(p["ma_windows"]) + [p["vol_window"], p["rsi_period"]]:
+        if is_time_window(w):
+            span = max(span, pd.Timedelta(w))
+        else:
+            bars = max(bars, int(w) + 1)
+    for w in (slow, signal):
+        if is_time_window(w):
+            span += 10 * pd.Timedelta(w)
+        else:
+            bars += 10 * int(w)
+    return bars, span
+
+def iter_feature_chunks(chunks, params: dict = None):
+    """
+    add_features over consecutive, time-sorted bar chunks (e.g. OHLCVStore.iter_bars) so
+    intraday histories are processed a slice at a time. Each chunk is computed together with
+    the tail of the previous one and only its own rows are yielded.
+    """
+    p = {**FEATURE_PARAMS, **(params or {})}
+    warm_bars, warm_span = _warmup(p)
+
+    tail, last = None, None
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        window = chunk if tail is None else pd.concat([tail, chunk])
+        feat = add_features(window, p)
+
+        dates = pd.DatetimeIndex(feat["Date"] if "Date" in feat.columns else feat.index)
+        if last is not None:
+            feat = feat[dates > last]
+        if not feat.empty:
+            yield feat
+
+        wd = pd.DatetimeIndex(window["Date"] if "Date" in window.columns else window.index)
+        last = wd[-1]
+        keep = warm_bars
+        if warm_span > pd.Timedelta(0):
+            # One row older than the time span so the oldest window is complete
+            keep = max(keep, int((wd >= last - warm_span).sum()) + 1)
+        tail = window.iloc[-keep:]
+
+def add_features_chunked(df: pd.DataFrame, params: dict = None, chunk_rows: int = CHUNK_ROWS) -> pd.DataFrame:
+    """
+    Same rows as add_features(df) with peak temporaries bounded by chunk_rows.
+    """
+    chunks = (df.iloc[i:i + chunk_rows] for i in range(0, len(df), chunk_rows))
+    parts = list(iter_feature_chunks(chunks, params))
+    return pd.concat(parts) if parts else add_features(df.iloc[:0], params)
+
+def _rows_with_targets(df: pd.DataFrame, targets: pd.DataFrame) -> pd.DataFrame:
+    # Usually only the last rows lack a target: slice (a view) instead of copying through dropna
+    keep = targets.notna().all(axis=1).to_numpy() & df.notna().all(axis=1).to_numpy()
+    k = int(keep.sum())
+    if keep[:k].all():
+        return df.iloc[:k].assign(**{c: targets[c].iloc[:k] for c in targets.columns})
+    return df[keep].assign(**{c: targets[c][keep] for c in targets.columns})
 
 def prepare_dataset(df: pd.DataFrame):
-    df = df.copy()
-    df["Target"] = df["Close"].shift(-1)
-    df = df.dropna()
+    df = _rows_with_targets(df, pd.DataFrame({"Target": df["Close"].shift(-1)}))
 
-    feature_cols = [
-        "Close", "MA_10", "MA_20", "MA_50",
-        "Return", "Volatility",
-        "RSI", "MACD", "MACD_Signal", "MACD_Hist"
-    ]
+    feature_cols = list(FEATURE_COLS)
 
     X = df[feature_cols]
     y = df["Target"]
     return X, y, df, feature_cols
+
+def prepare_multi_horizon(df: pd.DataFrame, horizon: int = 7):
+    """
+    Like prepare_dataset but with one target column per horizon:
+    Target_k = Close k bars ahead, for k = 1..horizon.
+    """
+    target_cols = [f"Target_{k}" for k in range(1, horizon + 1)]
+    targets = pd.DataFrame({col: df["Close"].shift(-k) for k, col in enumerate(target_cols, start=1)})
+    df = _rows_with_targets(df, targets)
+
+    feature_cols = list(FEATURE_COLS)
+
+    X = df[feature_cols]
+    Y = df[target_cols]
+    return X, Y, df, feature_cols
+
+
+# ---------------- PANEL MODE (time x symbols) ----------------
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    # Cumulative-sum window over axis 0; windows touching a NaN stay NaN
+    ok = ~np.isnan(x)
+    cs = np.zeros((x.shape[0] + 1,) + x.shape[1:])
+    np.cumsum(np.where(ok, x, 0.0), axis=0, out=cs[1:])
+    cnt = np.zeros(cs.shape, dtype=np.int64)
+    np.cumsum(ok, axis=0, out=cnt[1:])
+
+    out = np.full(x.shape, np.nan)
+    if x.shape[0] >= window:
+        sums = cs[window:] - cs[:-window]
+        full = (cnt[window:] - cnt[:-window]) == window
+        out[window - 1:] = np.where(full, sums / window, np.nan)
+    return out
+
+
+def _rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    # Sample std (ddof=1) from rolling E[x] and E[x^2]
+    mean = _rolling_mean(x, window)
+    mean_sq = _rolling_mean(x * x, window)
+    var = (mean_sq - mean * mean) * window / (window - 1)
+    return np.sqrt(np.clip(var, 0.0, None))
+
+
+def _ema(x: np.ndarray, span: int) -> np.ndarray:
+    """
+    ewm(span, adjust=False).mean() for every column at once.
+    The recursion y[t] = a*x[t] + (1-a)*y[t-1] runs as one IIR filter (lfilter).
+    """
+    from scipy.signal import lfilter
+
+    alpha = 2.0 / (span + 1.0)
+    filled = pd.DataFrame(x).ffill().to_numpy()
+    lead = np.isnan(filled)
+
+    # Seed each column with its first valid value so leading NaNs do not poison the filter
+    first_idx = np.argmax(~lead, axis=0)
+    first = filled[first_idx, np.arange(filled.shape[1])]
+    filled = np.where(lead, first, filled)
+
+    zi = ((1.0 - alpha) * first)[np.newaxis, :]
+    out, _ = lfilter([alpha], [1.0, -(1.0 - alpha)], filled, axis=0, zi=zi)
+    out[lead] = np.nan
+    return out
+
+
+def add_features_panel(close: np.ndarray, dtype=np.float64, params: dict = None):
+    """
+    Vectorized add_features for many symbols, with the same FEATURE_PARAMS (bar-count windows only).
+    close: (time, symbols) array of aligned closes (NaN where a symbol has no bar).
+    Returns (features, valid): features is (time, symbols, len(FEATURE_COLS)) in FEATURE_COLS order,
+    valid marks the rows add_features would keep after dropna().
+    """
+    p = {**FEATURE_PARAMS, **(params or {})}
+    short, mid, long = p["ma_windows"]
+    fast, slow, signal = p["macd"]
+    windows = [short, mid, long, p["vol_window"], p["rsi_period"], fast, slow, signal]
+    if any(is_time_window(w) for w in windows):
+        raise ValueError("add_features_panel needs bar-count windows; use add_features for time spans")
+
+    close = np.asarray(close, dtype=np.float64)
+    if close.ndim == 1:
+        close = close[:, np.newaxis]
+    T, S = close.shape
+
+    prev = np.vstack([np.full((1, S), np.nan), close[:-1]])
+    ret = close / prev - 1.0
+    delta = close - prev
+
+    # RSI: NaN deltas count as 0 gain / 0 loss, like compute_rsi
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    rs = _rolling_mean(gain, p["rsi_period"]) / (_rolling_mean(loss, p["rsi_period"]) + 1e-9)
+
+    ema_fast = _ema(close, fast)
+    ema_slow = _ema(close, slow)
+    macd = ema_fast - ema_slow
+    macd_signal = _ema(macd, signal)
+
+    features = np.empty((T, S, len(FEATURE_COLS)), dtype=dtype)
+    features[..., 0] = close
+    features[..., 1] = _rolling_mean(close, short)
+    features[..., 2] = _rolling_mean(close, mid)
+    features[..., 3] = _rolling_mean(close, long)
+    features[..., 4] = ret
+    features[..., 5] = _rolling_std(ret, p["vol_window"])
+    features[..., 6] = 100 - (100 / (1 + rs))
+    features[..., 7] = macd
+    features[..., 8] = macd_signal
+    features[..., 9] = macd - macd_signal
+
+    valid = ~np.isnan(features).any(axis=2)
+    return features, valid
+
+
+def close_panel(frames: dict):
+    """
+    Align {symbol: df} frames (Date + Close) into a (time, symbols) close matrix.
+    Returns (dates, symbols, close).
+    """
+    symbols = list(frames)
+    closes = pd.concat(
+        {sym: df.set_index("Date")["Close"] if "Date" in df.columns else df["Close"] for sym, df in frames.items()},
+        axis=1
+    ).sort_index()
+    return closes.index, symbols, closes[symbols].to_numpy(dtype=np.float64)
+
+
+def panel_features(frames: dict, params: dict = None) -> dict:
+    """
+    {symbol: add_features(df)[FEATURE_COLS]} (Date-indexed) with one add_features_panel pass per
+    trading calendar. Symbols are only aligned with others that have exactly the same dates, so no
+    window ever spans a gap and the values match add_features.
+    """
+    calendars = {}
+    for sym, df in frames.items():
+        dates = pd.DatetimeIndex(df["Date"] if "Date" in df.columns else df.index)
+        calendars.setdefault(dates.asi8.tobytes(), {})[sym] = df
+
+    out = {}
+    for group in calendars.values():
+        dates, symbols, close = close_panel(group)
+        dtype = np.result_type(*(df["Close"].dtype for df in group.values()))
+        features, valid = add_features_panel(close, dtype=dtype, params=params)
+        for j, sym in enumerate(symbols):
+            rows = valid[:, j]
+            out[sym] = pd.DataFrame(features[rows, j], index=dates[rows].rename("Date"), columns=FEATURE_COLS)
+    return out
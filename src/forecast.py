@@ -1,10 +1,74 @@
+import numpy as np
+
+
+def _supports_multi_output(model) -> bool:
+    # sklearn >= 1.6 exposes tags via __sklearn_tags__, older versions via _get_tags
+    if hasattr(model, "__sklearn_tags__"):
+        try:
+            return bool(model.__sklearn_tags__().target_tags.multi_output)
+        except Exception:
+            pass
+    if hasattr(model, "_get_tags"):
+        return bool(model._get_tags().get("multioutput", False))
+    return False
+
+
+def fit_direct_forecaster(model, X, Y):
+    """
+    Direct multi-horizon forecaster: one fit on Y = (Target_1..Target_N),
+    so the whole horizon comes out of a single predict call.
+    Estimators without native multi-output support get one model per horizon.
+    """
+    if not _supports_multi_output(model):
+        from sklearn.multioutput import MultiOutputRegressor
+        model = MultiOutputRegressor(model)
+
+    model.fit(X, Y)
+    return model
+
+
+def forecast_direct(model, last_rows) -> np.ndarray:
+    """
+    Batched forecast. last_rows: one feature row or a (n_rows, n_features) block
+    (e.g. the last row of many symbols). Returns (n_rows, horizon).
+    """
+    rows = np.asarray(last_rows, dtype=float)
+    if rows.ndim == 1:
+        rows = rows.reshape(1, -1)
+
+    preds = np.asarray(model.predict(rows), dtype=float)
+    return preds.reshape(rows.shape[0], -1)
+
+
+def forecast_many(model, rows_by_symbol: dict) -> dict:
+    """
+    Forecast several symbols' last rows in one predict call.
+    """
+    symbols = list(rows_by_symbol)
+    if not symbols:
+        return {}
+
+    preds = forecast_direct(model, np.vstack([rows_by_symbol[s] for s in symbols]))
+    return {s: preds[i].tolist() for i, s in enumerate(symbols)}
+
+
 def forecast_next_days(model, last_features_row, days=7):
-    preds = []
-    current = last_features_row.copy()
+    # ✅ Direct model: whole horizon from one predict
+    first = forecast_direct(model, last_features_row)[0]
+    if len(first) >= days:
+        return [float(p) for p in first[:days]]
+    if first.shape != (1,):
+        raise ValueError(
+            f"Model forecasts {len(first)} days but {days} were requested; "
+            f"refit it with a horizon of at least {days}"
+        )
+
+    # Single-output model: recursive, feeding the prediction back as Close
+    preds = [float(first[0])]
+    current = np.asarray(last_features_row, dtype=float).reshape(1, -1).copy()
 
-    for _ in range(days):
-        nxt = model.predict([current])[0]
-        preds.append(float(nxt))
-        current[0] = nxt
+    for _ in range(days - 1):
+        current[0, 0] = preds[-1]
+        preds.append(float(model.predict(current)[0]))
 
     return preds
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+PRICE_COLS = ("Open", "High", "Low", "Close", "Adj Close")
+
+# Compact mode: prices and features in float32 (half of float64), volume in uint32 when it fits
+COMPACT_FLOAT = np.float32
+
+_UINT32_MAX = np.iinfo(np.uint32).max
+
+
+def bar_dates(df: pd.DataFrame) -> pd.DatetimeIndex:
+    """
+    Bar timestamps whether they are a Date column or the index.
+    """
+    return pd.DatetimeIndex(df["Date"] if "Date" in df.columns else df.index)
+
+
+def volume_dtype(volume: pd.Series):
+    # Integer counts: uint32 when every value fits, else int64; volumes with gaps stay float
+    values = volume.to_numpy()
+    if len(values) == 0:
+        return np.uint32
+    if np.isnan(values.astype(np.float64, copy=False)).any():
+        return volume.dtype
+    if values.min() < 0 or np.any(values != np.floor(values)):
+        return volume.dtype
+    return np.uint32 if values.max() <= _UINT32_MAX else np.int64
+
+
+def compact_bars(df: pd.DataFrame, float_dtype=COMPACT_FLOAT) -> pd.DataFrame:
+    """
+    OHLCV frame with float32 prices and integer volume. Other columns are left as they are.
+    """
+    dtypes = {col: float_dtype for col in PRICE_COLS if col in df.columns}
+    if "Volume" in df.columns:
+        dtypes["Volume"] = volume_dtype(df["Volume"])
+    return df.astype(dtypes)
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def memory_report(frames: dict) -> pd.DataFrame:
+    """
+    {symbol: frame} -> rows, columns, MB and bytes per row for each symbol, largest first.
+    """
+    rows = []
+    for symbol, df in frames.items():
+        size = frame_bytes(df)
+        rows.append({
+            "symbol": symbol,
+            "rows": len(df),
+            "columns": df.shape[1],
+            "mb": size / 1024 ** 2,
+            "bytes_per_row": size / len(df) if len(df) else 0.0,
+        })
+    report = pd.DataFrame(rows, columns=["symbol", "rows", "columns", "mb", "bytes_per_row"])
+    return report.sort_values("mb", ascending=False).reset_index(drop=True)
@@ -1,14 +1,50 @@
+import numpy as np
 import pandas as pd
 
-def compute_rsi(df: pd.DataFrame, period: int = 14) -> pd.Series:
+# An EMA "span" given as time (e.g. "2h") decays with this half-life per unit of span,
+# the large-span limit of span N bars -> half-life N * ln(2) / 2 bars
+_SPAN_TO_HALFLIFE = np.log(2) / 2
+
+
+def _dates(df: pd.DataFrame) -> pd.DatetimeIndex:
+    return pd.DatetimeIndex(df["Date"] if "Date" in df.columns else df.index)
+
+def is_time_window(window) -> bool:
+    """
+    Windows are bar counts (int) or time spans ("30min", "4h", "5D").
+    """
+    return not isinstance(window, (int, np.integer))
+
+def rolling(s: pd.Series, window, dates=None, stat: str = "mean") -> pd.Series:
+    """
+    Rolling mean/std/... over a window in bars or in time.
+    Time windows stay NaN until a full window of history exists, like bar windows.
+    """
+    if not is_time_window(window):
+        return getattr(s.rolling(window), stat)()
+
+    span = pd.Timedelta(window)
+    dates = pd.DatetimeIndex(dates)
+    out = getattr(pd.Series(s.to_numpy(), index=dates).rolling(span), stat)().to_numpy(copy=True)
+    out[dates < dates[0] + span] = np.nan
+    return pd.Series(out, index=s.index, name=s.name)
+
+def ema(s: pd.Series, span, dates=None) -> pd.Series:
+    if not is_time_window(span):
+        return s.ewm(span=span, adjust=False).mean()
+    halflife = pd.Timedelta(span) * _SPAN_TO_HALFLIFE
+    return s.ewm(halflife=halflife, times=pd.DatetimeIndex(dates), adjust=False).mean()
+
+def compute_rsi(df: pd.DataFrame, period=14) -> pd.Series:
     close = df["Close"]
     delta = close.diff()
+    dates = _dates(df) if is_time_window(period) else None
 
     gain = delta.where(delta > 0, 0.0)
     loss = -delta.where(delta < 0, 0.0)
 
-    avg_gain = gain.rolling(period).mean()
-    avg_loss = loss.rolling(period).mean()
+    avg_gain = rolling(gain, period, dates)
+    avg_loss = rolling(loss, period, dates)
 
     rs = avg_gain / (avg_loss + 1e-9)
     rsi = 100 - (100 / (1 + rs))
@@ -16,11 +52,12 @@ def compute_rsi(df: pd.DataFrame, period: int = 14) -> pd.Series:
 
 def compute_macd(df: pd.DataFrame, fast=12, slow=26, signal=9):
     close = df["Close"]
-    ema_fast = close.ewm(span=fast, adjust=False).mean()
-    ema_slow = close.ewm(span=slow, adjust=False).mean()
+    dates = _dates(df) if any(is_time_window(w) for w in (fast, slow, signal)) else None
+    ema_fast = ema(close, fast, dates)
+    ema_slow = ema(close, slow, dates)
 
     macd = ema_fast - ema_slow
-    macd_signal = macd.ewm(span=signal, adjust=False).mean()
+    macd_signal = ema(macd, signal, dates)
     macd_hist = macd - macd_signal
 
     return macd, macd_signal, macd_hist
@@ -0,0 +1,43 @@
+"""
+Entry module of the job pool's worker processes.
+
+A spawned child first re-imports its parent's __main__. Under Streamlit that is app.py,
+so every worker would run the whole app. Processes started from WORKER_CONTEXT import
+this module as their main instead; the parent's __main__ is read, never replaced.
+"""
+import threading
+from multiprocessing import context, spawn
+
+# Set while this thread starts a worker, so other spawns (scan.py, PDF pages) are untouched
+_starting = threading.local()
+_get_preparation_data = spawn.get_preparation_data
+
+
+def _preparation_data(name):
+    data = _get_preparation_data(name)
+    if getattr(_starting, "worker", False):
+        data.pop("init_main_from_path", None)
+        data["init_main_from_name"] = __name__
+    return data
+
+
+# Every start method (posix spawn, win32 spawn, forkserver) builds the child's setup here
+spawn.get_preparation_data = _preparation_data
+
+
+class WorkerProcess(context.SpawnProcess):
+    @staticmethod
+    def _Popen(process_obj):
+        _starting.worker = True
+        try:
+            return context.SpawnProcess._Popen(process_obj)
+        finally:
+            _starting.worker = False
+
+
+class WorkerContext(context.SpawnContext):
+    Process = WorkerProcess
+
+
+# spawn: never fork a multi-threaded server process
+WORKER_CONTEXT = WorkerContext()
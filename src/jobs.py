@@ -0,0 +1,385 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from src import db
+from src.cache import stage_key
+from src.job_worker import WORKER_CONTEXT
+
+JOBS_DIR = "data/jobs"
+
+# Shared by every session of the server: fits queue up instead of fighting for cores
+JOB_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+# Running jobs touch heartbeat_at this often; silent for STALE_SECONDS = worker is gone
+HEARTBEAT_SECONDS = 5
+STALE_SECONDS = 60
+
+# Finished jobs (rows + result files) are pruned after this long
+RESULT_TTL_SECONDS = 7 * 24 * 3600
+
+ACTIVE = ("queued", "running")
+
+JOB_KINDS = {}
+
+
+class JobPending(Exception):
+    """
+    Raised by JobQueue.run() while the job is still queued or running.
+    """
+
+    def __init__(self, job: dict):
+        super().__init__(f"{job['label'] or job['job_key']} is {job['status']}")
+        self.job = job
+
+
+class JobFailed(RuntimeError):
+    """
+    Raised by JobQueue.run() for a failed job; JobQueue.retry() lets it run again.
+    """
+
+    def __init__(self, job: dict):
+        super().__init__(f"{job['label'] or job['job_key']} failed: {job['error']}")
+        self.job = job
+
+
+def job_kind(name: str):
+    """
+    Register fn(params, progress) -> picklable result as a job kind.
+    progress(fraction, message) reports back to the job table.
+    """
+    def register(fn):
+        JOB_KINDS[name] = fn
+        return fn
+    return register
+
+
+def _threads_per_job() -> int:
+    return max(1, (os.cpu_count() or 1) // JOB_WORKERS)
+
+
+def _job_features(params, progress):
+    """
+    The feature frame the job was submitted for, or, when that stored version has been
+    pruned meanwhile, features recomputed from the OHLCV store (same symbol, start, interval).
+    """
+    from src.cache import data_version
+    from src.data_loader import load_stock_data
+    from src.feature_store import get_features, load_features
+
+    progress(0.05, "loading features")
+    df_feat = load_features(params["series"], params["data_version"])
+    if df_feat is not None:
+        return df_feat
+
+    progress(0.05, "recomputing features")
+    df = load_stock_data(params["symbol"], start=params["start"], interval=params["interval"])
+    return get_features(params["series"], df, data_version(df), interval=params["interval"])
+
+
+@job_kind("forecast")
+def _forecast_job(params, progress):
+    from src.pipeline import train_and_forecast
+
+    df_feat = _job_features(params, progress)
+    progress(0.1, f"fitting {params['model']}")
+    return train_and_forecast(params["series"], df_feat, params["model"], params["horizon"],
+                              n_jobs=_threads_per_job(), max_samples=params.get("max_samples"))
+
+
+@job_kind("select")
+def _select_job(params, progress):
+    from src.model_selection import select_model
+
+    df_feat = _job_features(params, progress)
+    progress(0.1, "cross-validating models")
+    return select_model(df_feat, n_jobs=_threads_per_job())
+
+
+# ---------------- WORKER SIDE ----------------
+def _write_result(key: str, result, jobs_dir: str) -> str:
+    import joblib
+
+    os.makedirs(jobs_dir, exist_ok=True)
+    path = os.path.join(jobs_dir, f"{key}.pkl")
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    joblib.dump(result, tmp)
+    os.replace(tmp, path)
+    return path
+
+
+def _execute(key: str, kind: str, params: dict, db_path: str, jobs_dir: str):
+    """
+    Runs in a pool process: claim the queued row, run the job, store the result.
+    A row that was cancelled meanwhile is left alone.
+    """
+    conn = db.get_conn(db_path)
+    now = time.time()
+    claimed = conn.execute(
+        "UPDATE jobs SET status = 'running', started_at = ?, heartbeat_at = ? WHERE job_key = ? AND status = 'queued'",
+        (now, now, key)
+    ).rowcount
+    if not claimed:
+        return
+
+    stop = threading.Event()
+
+    def beat():
+        # Own connection: sqlite connections are per thread
+        beat_conn = db.get_conn(db_path)
+        while not stop.wait(HEARTBEAT_SECONDS):
+            beat_conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE job_key = ?", (time.time(), key))
+
+    def progress(fraction: float, message: str = ""):
+        conn.execute(
+            "UPDATE jobs SET progress = ?, message = ?, heartbeat_at = ? WHERE job_key = ? AND status = 'running'",
+            (float(fraction), message, time.time(), key)
+        )
+
+    threading.Thread(target=beat, daemon=True).start()
+    try:
+        result = JOB_KINDS[kind](params, progress)
+        path = _write_result(key, result, jobs_dir)
+        conn.execute(
+            "UPDATE jobs SET status = 'done', progress = 1, message = '', result_path = ?, finished_at = ? "
+            "WHERE job_key = ? AND status = 'running'",
+            (path, time.time(), key)
+        )
+    except Exception as e:
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE job_key = ? AND status = 'running'",
+            (f"{type(e).__name__}: {e}", time.time(), key)
+        )
+    finally:
+        stop.set()
+
+
+# ---------------- SCHEDULER ----------------
+def _owner_alive(owner: str) -> bool:
+    host, _, pid = (owner or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True  # can't tell for other machines, leave it to the heartbeat
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobQueue:
+    """
+    Bounded process pool plus a persistent job table (SQLite `jobs`).
+
+    Jobs are keyed by their inputs, e.g. (kind, symbol, model, horizon, data version):
+    submitting a key that is already queued/running/done returns that job instead of
+    starting another one, whoever submitted it. Jobs of the same group with an older
+    key (superseded data or params) are cancelled.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS, db_path: str = None, jobs_dir: str = JOBS_DIR):
+        self.max_workers = max_workers
+        self.db_path = db_path or db.DB_PATH
+        self.jobs_dir = jobs_dir
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._pool = None
+        self._futures = {}
+        self._lock = threading.Lock()
+
+        db.init_db(self.db_path)
+        self.cancel_stale()
+
+    def _pool_submit(self, *args):
+        # Workers are spawned on demand inside submit(); a crashed worker breaks the pool, so start a new one
+        for attempt in range(2):
+            with self._lock:
+                if self._pool is None:
+                    # Spawned workers start from src.job_worker, not the app script
+                    self._pool = ProcessPoolExecutor(self.max_workers, mp_context=WORKER_CONTEXT)
+                pool = self._pool
+            try:
+                return pool.submit(*args)
+            except BrokenProcessPool:
+                with self._lock:
+                    if self._pool is pool:
+                        self._pool = None
+                if attempt:
+                    raise
+
+    def submit(self, kind: str, params: dict, key_parts=(), group_parts=(), label: str = "",
+               user: str = None, expected_seconds: float = None) -> dict:
+        """
+        Queue a job unless an identical one is already queued, running, done or failed
+        (a failed job is only re-run after retry()).
+        key_parts identify the result; group_parts identify "the same job for newer inputs".
+        Returns the job row.
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        key = stage_key(kind, *key_parts)
+        group = stage_key(kind, *group_parts)
+        self.cancel_stale()
+
+        with db.transaction(self.db_path) as conn:
+            row = conn.execute("SELECT status, result_path FROM jobs WHERE job_key = ?", (key,)).fetchone()
+            reuse = row is not None and (
+                row[0] in ACTIVE + ("failed",) or (row[0] == "done" and row[1] and os.path.exists(row[1]))
+            )
+            superseded = []
+            if not reuse:
+                conn.execute(
+                    "INSERT OR REPLACE INTO jobs (job_key, job_group, kind, label, status, progress, expected_seconds, "
+                    "owner, submitted_by, submitted_at) VALUES (?, ?, ?, ?, 'queued', 0, ?, ?, ?, ?)",
+                    (key, group, kind, label, expected_seconds, self.owner, user, time.time())
+                )
+                superseded = [r[0] for r in conn.execute(
+                    "SELECT job_key FROM jobs WHERE job_group = ? AND job_key != ? AND status IN ('queued', 'running')",
+                    (group, key)
+                )]
+                conn.executemany(
+                    "UPDATE jobs SET status = 'cancelled', error = 'superseded', finished_at = ? WHERE job_key = ?",
+                    [(time.time(), k) for k in superseded]
+                )
+
+        if not reuse:
+            future = self._pool_submit(_execute, key, kind, params, self.db_path, self.jobs_dir)
+            with self._lock:
+                self._futures[key] = future
+        for k in superseded:
+            with self._lock:
+                future = self._futures.pop(k, None)
+            if future is not None:
+                future.cancel()  # only stops jobs that have not started yet
+        return self.status(key)
+
+    def run(self, kind: str, params: dict, **submit_kwargs):
+        """
+        Result of the job if it is done, otherwise submit it and raise JobPending
+        (or JobFailed).
+        """
+        job = self.submit(kind, params, **submit_kwargs)
+        if job["status"] == "done":
+            return self.result(job["job_key"])
+        if job["status"] == "failed":
+            raise JobFailed(job)
+        raise JobPending(job)
+
+    def retry(self, key: str):
+        # Forget a failed/cancelled job so the next submit runs it again
+        db.get_conn(self.db_path).execute(
+            "DELETE FROM jobs WHERE job_key = ? AND status IN ('failed', 'cancelled')", (key,)
+        )
+
+    def status(self, key: str) -> dict:
+        cur = db.get_conn(self.db_path).execute("SELECT * FROM jobs WHERE job_key = ?", (key,))
+        row = cur.fetchone()
+        if row is None:
+            return None
+        return dict(zip([c[0] for c in cur.description], row))
+
+    def result(self, key: str):
+        import joblib
+
+        job = self.status(key)
+        if job is None or job["status"] != "done":
+            raise ValueError(f"Job {key} is not done")
+        return joblib.load(job["result_path"])
+
+    def wait(self, key: str, timeout: float = None, poll: float = 0.5):
+        """
+        Block until the job finishes and return its result (for scripts / deferred exports).
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            job = self.status(key)
+            if job is None:
+                raise ValueError(f"Unknown job {key}")
+            if job["status"] == "done":
+                return self.result(key)
+            if job["status"] in ("failed", "cancelled"):
+                raise RuntimeError(f"Job {job['label'] or key} {job['status']}: {job['error']}")
+            if deadline is not None and time.time() > deadline:
+                raise TimeoutError(f"Job {key} still {job['status']}")
+            time.sleep(poll)
+
+    def cancel_stale(self):
+        """
+        Cancel running jobs whose worker stopped sending heartbeats and queued jobs
+        whose server process is gone; prune finished jobs past RESULT_TTL_SECONDS.
+        """
+        now = time.time()
+        conn = db.get_conn(self.db_path)
+        conn.execute(
+            "UPDATE jobs SET status = 'cancelled', error = 'stale: no heartbeat', finished_at = ? "
+            "WHERE status = 'running' AND heartbeat_at < ?",
+            (now, now - STALE_SECONDS)
+        )
+
+        orphans = [
+            key for key, owner in conn.execute("SELECT job_key, owner FROM jobs WHERE status = 'queued' AND owner != ?",
+                                               (self.owner,))
+            if not _owner_alive(owner)
+        ]
+        conn.executemany(
+            "UPDATE jobs SET status = 'cancelled', error = 'stale: submitting server stopped', finished_at = ? "
+            "WHERE job_key = ? AND status = 'queued'",
+            [(now, key) for key in orphans]
+        )
+
+        expired = conn.execute(
+            "SELECT job_key, result_path FROM jobs WHERE status NOT IN ('queued', 'running') AND finished_at < ?",
+            (now - RESULT_TTL_SECONDS,)
+        ).fetchall()
+        for key, path in expired:
+            if path and os.path.exists(path):
+                os.remove(path)
+        conn.executemany("DELETE FROM jobs WHERE job_key = ?", [(key,) for key, _ in expired])
+
+    def recent(self, limit: int = 20, user: str = None):
+        """
+        Latest jobs, all of them or only those submitted by `user`.
+        """
+        import pandas as pd
+
+        where, params = ("WHERE submitted_by = ? ", (user, limit)) if user is not None else ("", (limit,))
+        df = pd.read_sql_query(
+            "SELECT label, kind, status, progress, message, error, submitted_by, submitted_at, started_at, finished_at "
+            f"FROM jobs {where}ORDER BY submitted_at DESC LIMIT ?",
+            db.get_conn(self.db_path), params=params
+        )
+        for col in ("submitted_at", "started_at", "finished_at"):
+            df[col] = pd.to_datetime(df[col], unit="s")
+        return df
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def estimated_progress(job: dict, now: float = None) -> float:
+    """
+    Reported progress, or for a running fit an estimate from its last fit time.
+    """
+    progress = job.get("progress") or 0.0
+    if job["status"] != "running" or not job.get("expected_seconds") or not job.get("started_at"):
+        return progress
+    elapsed = (now or time.time()) - job["started_at"]
+    return max(progress, min(0.95, 0.1 + 0.85 * elapsed / job["expected_seconds"]))
+
+
+_default_queue = None
+
+
+def get_job_queue() -> JobQueue:
+    global _default_queue
+    if _default_queue is None:
+        _default_queue = JobQueue()
+    return _default_queue
@@ -3,13 +3,15 @@ import joblib
 import numpy as np
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error
+from src.forecast import forecast_next_days
 
 MODEL_PATH = "models/stock_model.pkl"
 
 def train_model(X_train, y_train):
     model = RandomForestRegressor(
         n_estimators=400,
-        random_state=42
+        random_state=42,
+        n_jobs=-1
     )
     model.fit(X_train, y_train)
     return model
@@ -31,17 +33,8 @@ def load_model():
 
 def predict_next_days(model, last_row_features, days=7):
     """
-    Simple multi-step forecast:
-    uses previous prediction as next day's Close (approx)
+    Multi-step forecast:
+    direct models return the whole horizon from one predict,
+    single-output models fall back to feeding the prediction back as Close (approx)
     """
-    preds = []
-    current = last_row_features.copy()
-
-    for _ in range(days):
-        next_price = model.predict([current])[0]
-        preds.append(next_price)
-
-        # Update only Close feature for next step (simple approximation)
-        current[0] = next_price
-
-    return preds
+    return forecast_next_days(model, last_row_features, days=days)
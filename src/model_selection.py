@@ -0,0 +1,119 @@
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.model_selection import TimeSeriesSplit
+
+from src.features import prepare_dataset
+from src.models_ml import available_models, get_model, rmse
+
+# Walk-forward folds per candidate
+N_SPLITS = 5
+
+LEADERBOARD_COLS = [
+    "model", "mae", "rmse", "mae_std", "fit_seconds", "predict_seconds", "folds"
+]
+
+
+def _fold_tasks(n_rows: int, candidates, n_splits: int, max_train_size=None, gap: int = 0):
+    splitter = TimeSeriesSplit(n_splits=n_splits, max_train_size=max_train_size, gap=gap)
+    folds = list(splitter.split(np.arange(n_rows)))
+    return [(name, i, train, test) for name in candidates for i, (train, test) in enumerate(folds)]
+
+
+def _fit_fold(name: str, fold: int, X: np.ndarray, y: np.ndarray, train, test) -> dict:
+    # n_jobs=1 inside: the parallelism is across (candidate, fold) tasks
+    model = get_model(name, n_jobs=1)
+
+    t0 = time.perf_counter()
+    model.fit(X[train], y[train])
+    fit_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    preds = model.predict(X[test])
+    predict_seconds = time.perf_counter() - t0
+
+    return {
+        "model": name,
+        "fold": fold,
+        "mae": float(np.abs(y[test] - preds).mean()),
+        "rmse": rmse(y[test], preds),
+        "fit_seconds": fit_seconds,
+        "predict_seconds": predict_seconds,
+    }
+
+
+def leaderboard_from_folds(folds: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-fold scores -> one row per model, best (lowest mean MAE) first.
+    """
+    board = folds.groupby("model").agg(
+        mae=("mae", "mean"),
+        rmse=("rmse", "mean"),
+        mae_std=("mae", "std"),
+        fit_seconds=("fit_seconds", "sum"),
+        predict_seconds=("predict_seconds", "sum"),
+        folds=("fold", "count"),
+    )
+    return board.sort_values(["mae", "rmse"]).reset_index()[LEADERBOARD_COLS]
+
+
+def cross_validate_models(X, y, candidates=None, n_splits: int = N_SPLITS, n_jobs: int = -1,
+                          max_train_size=None, gap: int = 0) -> pd.DataFrame:
+    """
+    Walk-forward (TimeSeriesSplit) CV of every candidate, all (candidate, fold) fits run in parallel.
+    max_train_size keeps only the most recent rows per fold (faster on long histories).
+    Returns the leaderboard: mean MAE/RMSE over folds plus total fit/predict seconds.
+    """
+    candidates = list(candidates or available_models())
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    tasks = _fold_tasks(len(X), candidates, n_splits, max_train_size, gap)
+    rows = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_fold)(name, fold, X, y, train, test) for name, fold, train, test in tasks
+    )
+    return leaderboard_from_folds(pd.DataFrame(rows))
+
+
+def select_model(df_feat: pd.DataFrame, candidates=None, n_splits: int = N_SPLITS, n_jobs: int = -1,
+                 max_train_size=None):
+    """
+    Best next-day model for one add_features() frame: (model name, leaderboard).
+    """
+    X, y, _, _ = prepare_dataset(df_feat)
+    board = cross_validate_models(X, y, candidates, n_splits, n_jobs, max_train_size)
+    return board["model"].iloc[0], board
+
+
+def select_many(feature_frames: dict, candidates=None, n_splits: int = N_SPLITS, n_jobs: int = -1,
+                max_train_size=None):
+    """
+    Model selection for a whole watchlist in one parallel pass over every
+    (symbol, candidate, fold) fit, so a few slow symbols do not leave workers idle.
+    Returns ({symbol: best model name}, leaderboard with a symbol column).
+    """
+    candidates = list(candidates or available_models())
+
+    jobs = []
+    for symbol, df_feat in feature_frames.items():
+        X, y, _, _ = prepare_dataset(df_feat)
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        for name, fold, train, test in _fold_tasks(len(X), candidates, n_splits, max_train_size):
+            jobs.append((symbol, name, fold, X, y, train, test))
+
+    rows = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_fold)(name, fold, X, y, train, test) for _, name, fold, X, y, train, test in jobs
+    )
+    folds = pd.DataFrame(rows)
+    folds.insert(0, "symbol", [job[0] for job in jobs])
+
+    boards = [
+        leaderboard_from_folds(part.drop(columns="symbol")).assign(symbol=symbol)
+        for symbol, part in folds.groupby("symbol", sort=True)
+    ]
+    board = pd.concat(boards, ignore_index=True)[["symbol"] + LEADERBOARD_COLS] if boards else pd.DataFrame()
+    best = {symbol: part["model"].iloc[0] for symbol, part in board.groupby("symbol", sort=False)} if boards else {}
+    return best, board
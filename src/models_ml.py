@@ -1,18 +1,135 @@
+import time
+from importlib.util import find_spec
+
 import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor
 
-def get_model(model_name: str):
+# sklearn / xgboost are imported inside get_model so importing this module stays cheap
+
+# ✅ Use every core for tree building by default
+N_JOBS = -1
+
+# Every name get_model knows, in the order the UI lists them
+MODEL_NAMES = [
+    "Linear Regression", "Random Forest", "XGBoost",
+    "Ridge", "Extra Trees", "Gradient Boosting",
+]
+
+def available_models():
+    """
+    MODEL_NAMES minus the ones whose optional package is not installed (checked without importing it).
+    """
+    if find_spec("xgboost") is not None:
+        return list(MODEL_NAMES)
+    return [m for m in MODEL_NAMES if m != "XGBoost"]
+
+def get_model(model_name: str, n_jobs=N_JOBS, max_samples=None, warm_start=False):
+    """
+    max_samples caps the bootstrap sample per tree (int rows or float fraction)
+    which bounds memory and fit time on long histories.
+    """
     if model_name == "Linear Regression":
+        from sklearn.linear_model import LinearRegression
         return LinearRegression()
 
+    if model_name == "Ridge":
+        from sklearn.linear_model import Ridge
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import StandardScaler
+        return make_pipeline(StandardScaler(), Ridge(alpha=1.0))
+
+    if model_name == "XGBoost":
+        from xgboost import XGBRegressor
+
+        # ✅ CPU histogram trees, the fast exact-enough method
+        return XGBRegressor(
+            tree_method="hist",
+            n_estimators=400,
+            learning_rate=0.05,
+            max_depth=6,
+            subsample=0.8,
+            colsample_bytree=0.8,
+            random_state=42,
+            n_jobs=n_jobs,
+        )
+
+    if model_name == "Extra Trees":
+        from sklearn.ensemble import ExtraTreesRegressor
+        return ExtraTreesRegressor(n_estimators=300, random_state=42, n_jobs=n_jobs, max_samples=max_samples,
+                                   bootstrap=max_samples is not None)
+
+    if model_name == "Gradient Boosting":
+        from sklearn.ensemble import HistGradientBoostingRegressor
+        return HistGradientBoostingRegressor(max_iter=300, learning_rate=0.05, random_state=42)
+
+    from sklearn.ensemble import RandomForestRegressor
+
     if model_name == "Random Forest":
         return RandomForestRegressor(
             n_estimators=400,
-            random_state=42
+            random_state=42,
+            n_jobs=n_jobs,
+            max_samples=max_samples,
+            warm_start=warm_start
         )
 
-    return RandomForestRegressor(n_estimators=300, random_state=42)
+    return RandomForestRegressor(
+        n_estimators=300,
+        random_state=42,
+        n_jobs=n_jobs,
+        max_samples=max_samples,
+        warm_start=warm_start
+    )
 
 def rmse(y_true, y_pred):
     return float(np.sqrt(((y_true - y_pred) ** 2).mean()))
+
+
+# ---------------- TRAINING ENGINE ----------------
+def supports_warm_start(model) -> bool:
+    from sklearn.ensemble import RandomForestRegressor
+
+    return isinstance(model, RandomForestRegressor)
+
+
+def grow_forest(model, X_recent, y_recent, n_new_trees=40, max_trees=None):
+    """
+    Add n_new_trees fitted on a recent window while keeping the existing trees.
+    max_trees drops the oldest trees once the forest grows past it.
+    """
+    if not supports_warm_start(model) or not hasattr(model, "estimators_"):
+        raise ValueError("grow_forest needs a fitted RandomForestRegressor")
+
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + n_new_trees)
+    model.fit(X_recent, y_recent)
+
+    if max_trees is not None and len(model.estimators_) > max_trees:
+        model.estimators_ = model.estimators_[-max_trees:]
+        model.set_params(n_estimators=max_trees)
+
+    model.set_params(warm_start=False)
+    return model
+
+
+def fit_with_stats(model, X, y, fit=None):
+    """
+    Fit (or run fit(model, X, y) if given) and report wall/CPU time and the peak RSS
+    during the fit (and how far above the starting RSS it went), so worker counts can
+    be sized from real numbers.
+    """
+    from src.profiling import peak_rss
+
+    t0, c0 = time.perf_counter(), time.process_time()
+    with peak_rss() as rss:
+        fitted = fit(model, X, y) if fit is not None else model.fit(X, y)
+
+    peak = rss["peak_mb"]
+    stats = {
+        "fit_seconds": round(time.perf_counter() - t0, 4),
+        "cpu_seconds": round(time.process_time() - c0, 4),
+        "peak_rss_mb": round(peak, 1) if peak is not None else None,
+        "peak_rss_delta_mb": round(peak - rss["start_mb"], 1) if peak is not None else None,
+        "rows": len(X),
+        "n_jobs": getattr(model, "n_jobs", None),
+        "max_samples": getattr(model, "max_samples", None),
+    }
+    return fitted, stats
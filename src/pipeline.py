@@ -0,0 +1,151 @@
+import pandas as pd
+
+from src.features import add_features, prepare_multi_horizon
+from src.forecast import forecast_next_days
+from src.frames import bar_dates, frame_bytes
+from src.models_ml import get_model, rmse
+from src.registry import get_registry
+from src.signals import DEFAULT_RULE, generate_signals, label_signals, signal_label
+
+# scan_symbol model name that picks the best model by walk-forward CV first
+AUTO_MODEL = "auto"
+
+# Models are fitted for this many days ahead; shorter forecasts are the first days of it,
+# so changing the forecast length never refits
+MAX_HORIZON = 14
+
+REPORT_COLS = [
+    "Date", "Open", "High", "Low", "Close",
+    "MA_20", "MA_50", "RSI", "MACD", "MACD_Signal", "Signal"
+]
+
+
+def train_and_forecast(symbol: str, df_feat: pd.DataFrame, model_name: str, horizon: int,
+                       registry=None, n_jobs=-1, max_samples=None) -> dict:
+    """
+    Fit (or reuse) the direct multi-horizon model, score next-day accuracy on the
+    last 20% of rows and forecast `horizon` days from the latest bar.
+    The model always covers at least MAX_HORIZON days, whatever `horizon` is asked for.
+    max_samples caps the rows each forest tree is fitted on (see get_model).
+    """
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import mean_absolute_error
+
+    registry = registry or get_registry()
+
+    # ✅ Direct multi-horizon targets: Target_1..Target_N, N fixed so every horizon shares one fit
+    X, Y, final_df, feature_cols = prepare_multi_horizon(df_feat, max(horizon, MAX_HORIZON))
+
+    X_train, X_test, Y_train, Y_test = train_test_split(
+        X, Y, test_size=0.2, shuffle=False
+    )
+
+    # ✅ Reuse the saved model while the training data is unchanged
+    train_dates = bar_dates(final_df)[:len(X_train)]
+    model, cached, model_path = registry.get_or_fit(
+        symbol, model_name, X_train, Y_train,
+        build=lambda: get_model(model_name, n_jobs=n_jobs, max_samples=max_samples),
+        data_range=(str(train_dates[0].date()), str(train_dates[-1].date()))
+    )
+
+    # Evaluate next-day accuracy
+    preds = model.predict(X_test).reshape(len(X_test), -1)[:, 0]
+    y_test = Y_test["Target_1"]
+
+    # Forecast future from the latest bar (one batched predict)
+    last_row = df_feat[feature_cols].iloc[-1].values
+    future_prices = forecast_next_days(model, last_row, days=horizon)
+
+    future_df = pd.DataFrame({
+        "Day": [f"Day {i+1}" for i in range(horizon)],
+        "Predicted Close": future_prices
+    })
+
+    return {
+        "model_path": model_path,
+        "cached": cached,
+        "fit_stats": registry.info(symbol, model_name, Y_train.shape[1]).get("fit_stats") or {},
+        "mae": float(mean_absolute_error(y_test, preds)),
+        "rmse": rmse(y_test.values, preds),
+        "future_prices": future_prices,
+        "future_df": future_df,
+    }
+
+
+def slice_forecast(result: dict, days: int) -> dict:
+    """
+    train_and_forecast result cut down to the first `days` forecast days.
+    """
+    return {
+        **result,
+        "future_prices": result["future_prices"][:days],
+        "future_df": result["future_df"].head(days),
+    }
+
+
+def report_frame(df_signals: pd.DataFrame, rows: int = 200) -> pd.DataFrame:
+    """
+    Export columns with plain signal labels; rows=None keeps the full history.
+    """
+    if "Date" not in df_signals.columns:
+        df_signals = df_signals.reset_index()
+    report_df = df_signals[REPORT_COLS] if rows is None else df_signals[REPORT_COLS].tail(rows)
+    return report_df.assign(Signal=label_signals(report_df["Signal"], emoji=False))
+
+
+def history_chunks(symbols, start="2018-01-01", rule: str = DEFAULT_RULE, compact: bool = False):
+    """
+    Full-history report of every symbol, one frame per symbol (Symbol column first).
+    Symbols are loaded and computed as the chunks are consumed, so a watchlist
+    export holds one symbol at a time. Symbols without data are skipped.
+    """
+    from src.data_loader import load_stock_data
+
+    for symbol in symbols:
+        try:
+            df = load_stock_data(symbol, start=start, compact=compact, date_index=compact)
+        except ValueError:
+            continue
+        report_df = report_frame(generate_signals(add_features(df), rule=rule), rows=None)
+        yield report_df.assign(Signal=report_df["Signal"].astype(str), Symbol=symbol)[["Symbol"] + REPORT_COLS]
+
+
+def scan_symbol(symbol: str, df: pd.DataFrame, model_name: str = "Random Forest", horizon: int = 7,
+                rule: str = DEFAULT_RULE, n_jobs: int = 1, max_samples=None, cv_mae: float = None) -> dict:
+    """
+    Whole pipeline for one symbol (features -> signals -> train/forecast) as one flat result row.
+    n_jobs=1 by default since batch scans already run one symbol per process.
+    model_name=AUTO_MODEL runs select_model() first and forecasts with the winner;
+    a model already picked elsewhere (run_scan uses select_many) comes in with its cv_mae.
+    df may be a compact frame (float32, DatetimeIndex) from load_stock_data(compact=True, date_index=True).
+    """
+    df_feat = add_features(df)
+    df_signals = generate_signals(df_feat, rule=rule)
+    latest = df_signals.iloc[-1]
+
+    if model_name == AUTO_MODEL:
+        from src.model_selection import select_model
+
+        model_name, board = select_model(df_feat, n_jobs=n_jobs)
+        cv_mae = float(board["mae"].iloc[0])
+
+    result = train_and_forecast(symbol, df_feat, model_name, horizon, n_jobs=n_jobs, max_samples=max_samples)
+
+    row = {
+        "symbol": symbol,
+        "last_date": bar_dates(df_signals)[-1].date().isoformat(),
+        "close": float(latest["Close"]),
+        "rsi": float(latest["RSI"]),
+        "signal": signal_label(latest["Signal"], emoji=False),
+        "model": model_name,
+        "mae": result["mae"],
+        "rmse": result["rmse"],
+        # Memory held for this symbol: input bars and the feature frame (signals share its columns)
+        "bars_mb": frame_bytes(df) / 1024 ** 2,
+        "features_mb": frame_bytes(df_feat) / 1024 ** 2,
+    }
+    if cv_mae is not None:
+        row["cv_mae"] = cv_mae
+    for i, price in enumerate(result["future_prices"], start=1):
+        row[f"pred_day_{i}"] = price
+    return row
@@ -0,0 +1,236 @@
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+class StageStats:
+    """
+    Process-wide aggregate per stage (count / total / min / max seconds),
+    exportable as JSON or Prometheus text for monitoring.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def add(self, stage: str, wall: float, cpu: float):
+        with self._lock:
+            s = self._stats.setdefault(stage, {"count": 0, "wall_total": 0.0, "cpu_total": 0.0,
+                                               "wall_min": float("inf"), "wall_max": 0.0})
+            s["count"] += 1
+            s["wall_total"] += wall
+            s["cpu_total"] += cpu
+            s["wall_min"] = min(s["wall_min"], wall)
+            s["wall_max"] = max(s["wall_max"], wall)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {k: dict(v, wall_avg=v["wall_total"] / v["count"]) for k, v in self._stats.items()}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, prefix: str = "stock_dashboard_stage") -> str:
+        lines = [
+            f"# TYPE {prefix}_seconds_total counter",
+            f"# TYPE {prefix}_calls_total counter",
+        ]
+        for stage, s in sorted(self.snapshot().items()):
+            lines.append(f'{prefix}_seconds_total{{stage="{stage}"}} {s["wall_total"]:.6f}')
+            lines.append(f'{prefix}_cpu_seconds_total{{stage="{stage}"}} {s["cpu_total"]:.6f}')
+            lines.append(f'{prefix}_calls_total{{stage="{stage}"}} {s["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+STATS = StageStats()
+
+
+def current_rss_mb():
+    """
+    Resident set size of this process right now (MB); None where it can't be read.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except OSError:
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / 1024 ** 2
+
+
+def process_peak_rss_mb():
+    # High-water mark of the whole process so far (ru_maxrss); None on Windows
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if os.uname().sysname == "Darwin" else peak / 1024
+
+
+@contextmanager
+def peak_rss(interval: float = 0.01):
+    """
+    Highest process RSS (MB) while the block runs: sampled every `interval` seconds by a
+    background thread, or exact when the block raised the process high-water mark.
+    Yields a dict whose start_mb / peak_mb are filled in (None where RSS can't be read).
+    """
+    out = {"start_mb": current_rss_mb(), "peak_mb": None}
+    if out["start_mb"] is None:
+        yield out
+        return
+
+    max0 = process_peak_rss_mb()
+    seen = [out["start_mb"]]
+    stop = threading.Event()
+
+    def sample():
+        while not stop.wait(interval):
+            seen[0] = max(seen[0], current_rss_mb())
+
+    sampler = threading.Thread(target=sample, name="peak-rss", daemon=True)
+    sampler.start()
+    try:
+        yield out
+    finally:
+        stop.set()
+        sampler.join()
+        peak = max(seen[0], current_rss_mb())
+        max1 = process_peak_rss_mb()
+        if max0 is not None and max1 > max0:
+            peak = max(peak, max1)  # the block set the process peak, so that is its own peak
+        out["peak_mb"] = peak
+
+
+class RunTimer:
+    """
+    Per-run stage timings: wall time, CPU time of the calling thread, the process RSS
+    change over the stage and, when tracemalloc is running, Python memory allocated/peak
+    inside the stage. RSS is process-wide, so concurrent sessions show up in it too.
+
+    profile=True also runs cProfile and tracemalloc, but only while a stage runs, so
+    however the script run ends (error, st.stop, rerun) nothing stays switched on.
+    dump_profile() writes what was collected and ends profiling for this timer.
+    """
+
+    def __init__(self, stats: StageStats = STATS, profile: bool = False):
+        self.records = []
+        self.stats = stats
+        self.profiler = cProfile.Profile() if profile else None
+        self.snapshot = None
+        self._depth = 0
+        self._profiled = False
+
+    @contextmanager
+    def _profiling(self):
+        # Outermost stage only: stages resolved inside another stage are already covered
+        if self.profiler is None or self._depth:
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+            return
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        profiler = self.profiler
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another session is already profiling (only one profiler per process on 3.12+)
+            profiler = None
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if profiler is not None:
+                profiler.disable()
+                self._profiled = True
+            if started_tracing:
+                self.snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+
+    def dump_profile(self, out_dir: str = "exports/profiles") -> dict:
+        """
+        Write the stages' cProfile stats and last tracemalloc snapshot to
+        {out_dir}/run_<timestamp>.prof / .tracemalloc. Returns the paths written.
+        """
+        profiler, self.profiler = self.profiler, None
+        paths = {}
+        if profiler is None or (not self._profiled and self.snapshot is None):
+            return paths
+
+        os.makedirs(out_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        if self._profiled:
+            paths["profile"] = os.path.join(out_dir, f"run_{stamp}.prof")
+            profiler.dump_stats(paths["profile"])
+        if self.snapshot is not None:
+            paths["memory"] = os.path.join(out_dir, f"run_{stamp}.tracemalloc")
+            self.snapshot.dump(paths["memory"])
+        return paths
+
+    @contextmanager
+    def stage(self, name: str):
+        with self._profiling():
+            with self._measure(name):
+                yield
+
+    @contextmanager
+    def _measure(self, name: str):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            mem0, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        rss0 = current_rss_mb()
+        t0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - t0
+            cpu = time.thread_time() - c0
+            record = {"stage": name, "wall_s": wall, "cpu_s": cpu}
+            rss1 = current_rss_mb()
+            if rss0 is not None and rss1 is not None:
+                record["rss_delta_mb"] = rss1 - rss0
+            if tracing:
+                mem1, peak = tracemalloc.get_traced_memory()
+                record["alloc_mb"] = (mem1 - mem0) / 1024 ** 2
+                record["peak_mb"] = (peak - mem0) / 1024 ** 2
+            self.records.append(record)
+            if self.stats is not None:
+                self.stats.add(name, wall, cpu)
+
+    def timed(self, name: str = None):
+        """
+        Decorator form of stage().
+        """
+        def wrap(fn):
+            @functools.wraps(fn)
+            def inner(*args, **kwargs):
+                with self.stage(name or fn.__name__):
+                    return fn(*args, **kwargs)
+            return inner
+        return wrap
+
+    def to_frame(self) -> pd.DataFrame:
+        df = pd.DataFrame(self.records)
+        if not df.empty:
+            df = pd.concat([df, pd.DataFrame([{"stage": "TOTAL", "wall_s": df["wall_s"].sum(),
+                                               "cpu_s": df["cpu_s"].sum()}])], ignore_index=True)
+        return df
@@ -0,0 +1,244 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import joblib
+import pandas as pd
+
+from src.models_ml import fit_with_stats, grow_forest, supports_warm_start
+
+# Runtime artifacts, kept out of the tracked models/ files (see .gitignore)
+MODELS_DIR = "models/registry"
+
+# Evict least-recently-used artifacts beyond these budgets
+MAX_ARTIFACTS = 50
+MAX_BYTES = 2 * 1024 ** 3
+
+# Loaded models kept in process so a hit does not even touch disk
+MEMORY_SLOTS = 4
+
+# When only a few bars were appended, grow the stored forest instead of refitting:
+# new trees are fitted on the last GROW_WINDOW rows, and after MAX_GROWS
+# incremental updates the next miss does a full refit.
+GROW_MAX_NEW_ROWS = 20
+GROW_WINDOW = 250
+GROW_TREES = 40
+MAX_GROWS = 5
+
+
+def _safe(name: str) -> str:
+    return name.replace(" ", "_")
+
+
+# Estimator params that change how a fit runs, not what it produces
+RUNTIME_PARAMS = {"n_jobs", "verbose"}
+
+
+def data_fingerprint(X: pd.DataFrame, Y, params: dict) -> str:
+    """
+    Hash of the training data (values + dates/index), feature columns and hyperparameters.
+    """
+    params = {k: v for k, v in params.items() if k not in RUNTIME_PARAMS}
+    h = hashlib.sha256()
+    h.update(pd.util.hash_pandas_object(X, index=True).values.tobytes())
+    h.update(pd.util.hash_pandas_object(pd.DataFrame(Y), index=True).values.tobytes())
+    h.update(json.dumps(list(X.columns)).encode())
+    h.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Stores fitted models as models/registry/{symbol}_{model}_h{horizon}.pkl with a JSON
+    fingerprint next to it, and reuses them while the training data is unchanged.
+    """
+
+    def __init__(self, root: str = MODELS_DIR, max_artifacts: int = MAX_ARTIFACTS, max_bytes: int = MAX_BYTES):
+        self.root = root
+        self.max_artifacts = max_artifacts
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, symbol: str, model_name: str, horizon: int) -> str:
+        return f"{symbol}_{_safe(model_name)}_h{horizon}"
+
+    def _paths(self, key: str):
+        return os.path.join(self.root, f"{key}.pkl"), os.path.join(self.root, f"{key}.json")
+
+    def _read_meta(self, meta_path: str) -> dict:
+        if not os.path.exists(meta_path):
+            return {}
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_meta(self, meta_path: str, meta: dict):
+        tmp = meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, default=str)
+        os.replace(tmp, meta_path)
+
+    def _remember(self, key: str, fingerprint: str, model):
+        self._memory[key] = (fingerprint, model)
+        self._memory.move_to_end(key)
+        while len(self._memory) > MEMORY_SLOTS:
+            self._memory.popitem(last=False)
+
+    def info(self, symbol: str, model_name: str, horizon: int) -> dict:
+        """
+        Stored meta (fingerprint, data range, fit_stats, ...) for one artifact.
+        """
+        return self._read_meta(self._paths(self._key(symbol, model_name, horizon))[1])
+
+    def get_or_fit(self, symbol: str, model_name: str, X, Y, build, data_range=None):
+        """
+        Return (model, cached, model_path).
+        build() returns an unfitted estimator; the registry fits it on (X, Y) only on a miss.
+        data_range: optional (first_date, last_date) recorded in the meta for humans.
+        """
+        horizon = horizon_of(Y)
+        key = self._key(symbol, model_name, horizon)
+        model_path, meta_path = self._paths(key)
+
+        estimator = build()
+        params = estimator.get_params() if hasattr(estimator, "get_params") else {}
+        fingerprint = data_fingerprint(X, Y, params)
+
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and cached[0] == fingerprint:
+                self._memory.move_to_end(key)
+                self._touch(meta_path)
+                return cached[1], True, model_path
+
+            meta = self._read_meta(meta_path)
+            if meta.get("fingerprint") == fingerprint and os.path.exists(model_path):
+                model = joblib.load(model_path)
+                self._remember(key, fingerprint, model)
+                self._touch(meta_path)
+                return model, True, model_path
+
+        # ✅ Miss: fit outside the lock so other symbols are not blocked
+        grows = 0
+        grown = self._try_grow(meta, model_path, X, Y, params)
+        if grown is not None:
+            model, stats = grown
+            grows = meta.get("grows", 0) + 1
+        else:
+            model, stats = fit_with_stats(estimator, X, Y, fit=self._fit)
+
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            tmp = model_path + ".tmp"
+            joblib.dump(model, tmp)
+            os.replace(tmp, model_path)
+
+            if data_range is None:
+                data_range = (X.index[0], X.index[-1]) if len(X) else (None, None)
+            self._write_meta(meta_path, {
+                "symbol": symbol,
+                "model": model_name,
+                "horizon": horizon,
+                "fingerprint": fingerprint,
+                "params": params,
+                "feature_cols": list(X.columns),
+                "rows": len(X),
+                "data_start": data_range[0],
+                "data_end": data_range[1],
+                "grows": grows,
+                "fit_stats": stats,
+                "created_at": time.time(),
+                "last_used": time.time(),
+            })
+            self._remember(key, fingerprint, model)
+            self.evict()
+
+        return model, False, model_path
+
+    def _try_grow(self, meta: dict, model_path: str, X, Y, params: dict):
+        # Only when the stored model was trained on a strict prefix of (X, Y)
+        old_rows = meta.get("rows", 0)
+        new_rows = len(X) - old_rows
+        if not meta or not os.path.exists(model_path):
+            return None
+        if not 0 < new_rows <= GROW_MAX_NEW_ROWS or meta.get("grows", 0) >= MAX_GROWS:
+            return None
+        if data_fingerprint(X.iloc[:old_rows], Y.iloc[:old_rows], params) != meta.get("fingerprint"):
+            return None
+
+        model = joblib.load(model_path)
+        if not supports_warm_start(model):
+            return None
+
+        window = slice(max(0, len(X) - GROW_WINDOW), len(X))
+        y_recent = Y.iloc[window]
+        if horizon_of(Y) == 1 and getattr(y_recent, "ndim", 1) > 1:
+            y_recent = y_recent.iloc[:, 0]
+
+        return fit_with_stats(
+            model, X.iloc[window], y_recent,
+            fit=lambda m, X_, y_: grow_forest(m, X_, y_, n_new_trees=GROW_TREES)
+        )
+
+    def _fit(self, estimator, X, Y):
+        if horizon_of(Y) > 1:
+            from src.forecast import fit_direct_forecaster
+            return fit_direct_forecaster(estimator, X, Y)
+
+        # Single target: fit on a 1-D y
+        if getattr(Y, "ndim", 1) > 1:
+            Y = Y.iloc[:, 0] if hasattr(Y, "iloc") else Y[:, 0]
+        estimator.fit(X, Y)
+        return estimator
+
+    def _touch(self, meta_path: str):
+        meta = self._read_meta(meta_path)
+        if meta:
+            meta["last_used"] = time.time()
+            self._write_meta(meta_path, meta)
+
+    def evict(self):
+        """
+        Drop least-recently-used artifacts until both budgets are met.
+        Files without a registry meta (older manual saves) are left alone.
+        """
+        if not os.path.isdir(self.root):
+            return
+
+        entries = []
+        for name in os.listdir(self.root):
+            if not name.endswith(".json"):
+                continue
+            meta_path = os.path.join(self.root, name)
+            model_path = meta_path[:-5] + ".pkl"
+            if not os.path.exists(model_path):
+                continue
+            meta = self._read_meta(meta_path)
+            entries.append((meta.get("last_used", 0), os.path.getsize(model_path), model_path, meta_path))
+
+        entries.sort()
+        total = sum(e[1] for e in entries)
+        while entries and (len(entries) > self.max_artifacts or total > self.max_bytes):
+            _, size, model_path, meta_path = entries.pop(0)
+            for path in (model_path, meta_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._memory.pop(os.path.basename(model_path)[:-4], None)
+            total -= size
+
+
+def horizon_of(Y) -> int:
+    return 1 if getattr(Y, "ndim", 1) == 1 else Y.shape[1]
+
+
+_default_registry = None
+
+
+def get_registry() -> ModelRegistry:
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = ModelRegistry()
+    return _default_registry
@@ -1,6 +1,22 @@
 from fpdf import FPDF
+import hashlib
+import numpy as np
 import pandas as pd
 import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from src.exports import frame_digest, get_export_store
+
+# One translate() pass instead of a chain of .replace calls
+_EMOJI_TABLE = str.maketrans({
+    "✅": "BUY",
+    "❌": "SELL",
+    "⭐": "",
+    "📈": "",
+    "📌": "",
+    "📰": "",
+})
 
 def safe_text(text: str) -> str:
     """
@@ -8,20 +24,39 @@ def safe_text(text: str) -> str:
     """
     if text is None:
         return ""
-    return (
-        str(text)
-        .replace("✅", "BUY")
-        .replace("❌", "SELL")
-        .replace("⭐", "")
-        .replace("📈", "")
-        .replace("📌", "")
-        .replace("📰", "")
-        .encode("latin-1", "ignore")
-        .decode("latin-1")
-    )
+    return str(text).translate(_EMOJI_TABLE).encode("latin-1", "ignore").decode("latin-1")
 
-def create_pdf_report(symbol: str, forecast_df: pd.DataFrame, signal_text: str, sentiment_score: float):
-    pdf = FPDF()
+def _to_bytes(pdf: FPDF) -> bytes:
+    # fpdf 1.7 returns a latin-1 str, fpdf2 returns a bytearray
+    out = pdf.output(dest="S")
+    return out.encode("latin-1") if isinstance(out, str) else bytes(out)
+
+def _forecast_lines(forecast_df: pd.DataFrame):
+    prices = forecast_df["Predicted Close"].to_numpy(dtype=float)
+    return [f"{day} -> {price:.2f}" for day, price in zip(forecast_df["Day"].astype(str), prices)]
+
+def _sparkline(pdf: FPDF, closes, x: float, y: float, w: float, h: float):
+    """
+    Close-price line drawn with PDF vector lines (no image/plot dependency).
+    """
+    closes = np.asarray(closes, dtype=float)
+    closes = closes[~np.isnan(closes)]
+    if len(closes) < 2:
+        return
+
+    lo, hi = closes.min(), closes.max()
+    span = hi - lo if hi > lo else 1.0
+    xs = x + np.linspace(0, w, len(closes))
+    ys = y + h - (closes - lo) / span * h
+
+    pdf.set_draw_color(200, 200, 200)
+    pdf.rect(x, y, w, h)
+    pdf.set_draw_color(30, 90, 200)
+    for i in range(len(closes) - 1):
+        pdf.line(xs[i], ys[i], xs[i + 1], ys[i + 1])
+    pdf.set_draw_color(0, 0, 0)
+
+def _symbol_page(pdf: FPDF, symbol: str, forecast_df: pd.DataFrame, signal_text: str, sentiment_score: float, closes=None):
     pdf.add_page()
 
     pdf.set_font("Arial", size=14)
@@ -33,15 +68,139 @@ def create_pdf_report(symbol: str, forecast_df: pd.DataFrame, signal_text: str,
     pdf.cell(200, 10, txt=safe_text(f"Latest Signal: {signal_text}"), ln=True)
     pdf.ln(5)
 
+    if closes is not None and len(closes) > 1:
+        top = pdf.get_y()
+        _sparkline(pdf, closes, 10, top, 190, 45)
+        pdf.set_y(top + 50)
+
     pdf.set_font("Arial", size=12)
     pdf.cell(200, 10, txt="Forecast (Next Days):", ln=True)
 
     pdf.set_font("Arial", size=10)
-    for _, row in forecast_df.iterrows():
-        line = f"{row['Day']} -> {float(row['Predicted Close']):.2f}"
+    for line in _forecast_lines(forecast_df):
         pdf.cell(200, 8, txt=safe_text(line), ln=True)
 
-    os.makedirs("exports", exist_ok=True)
-    file_path = f"exports/{symbol}_report.pdf"
-    pdf.output(file_path)
-    return file_path
+def render_pdf_report(symbol: str, forecast_df: pd.DataFrame, signal_text: str, sentiment_score: float, closes=None) -> bytes:
+    """
+    Build the report fully in memory (for st.download_button), nothing written to disk.
+    """
+    pdf = FPDF()
+    _symbol_page(pdf, symbol, forecast_df, signal_text, sentiment_score, closes)
+    return _to_bytes(pdf)
+
+def _write_atomic(path: str, data: bytes):
+    # Unique temp name + rename: concurrent writers never interleave in one file
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def report_digest(symbol: str, forecast_df: pd.DataFrame, signal_text: str, sentiment_score: float, closes=None) -> str:
+    # The rendered bytes embed a creation time, so exports are keyed by the report inputs
+    h = hashlib.sha256(f"{symbol}|{signal_text}|{sentiment_score:.6f}".encode())
+    h.update(frame_digest(forecast_df).encode())
+    if closes is not None:
+        h.update(np.ascontiguousarray(closes, dtype=float).tobytes())
+    return h.hexdigest()[:16]
+
+def export_pdf_report(symbol: str, forecast_df: pd.DataFrame, signal_text: str, sentiment_score: float,
+                      closes=None, name: str = None) -> str:
+    """
+    Saved as exports/{name}_<input hash>.pdf, rendered only if that report was not exported yet.
+    """
+    return get_export_store().write_bytes(
+        f"{name or symbol}_report",
+        lambda: render_pdf_report(symbol, forecast_df, signal_text, sentiment_score, closes),
+        "pdf", digest=report_digest(symbol, forecast_df, signal_text, sentiment_score, closes)
+    )
+
+def create_pdf_report(symbol: str, forecast_df: pd.DataFrame, signal_text: str, sentiment_score: float):
+    return export_pdf_report(symbol, forecast_df, signal_text, sentiment_score)
+
+
+# ---------------- BATCH ----------------
+def _cover_page(pdf: FPDF, items):
+    pdf.set_font("Arial", size=16)
+    pdf.add_page()
+    pdf.cell(200, 12, txt="Watchlist Report", ln=True, align="C")
+    pdf.set_font("Arial", size=10)
+    for item in items:
+        line = f"{item['symbol']}: {item['signal_text']}  (sentiment {item['sentiment_score']:.3f})"
+        pdf.cell(200, 7, txt=safe_text(line), ln=True)
+
+def create_watchlist_report(items, file_path: str = None) -> bytes:
+    """
+    One PDF with a page per symbol (sparkline chart included).
+    items: dicts with symbol, forecast_df, signal_text, sentiment_score and optional closes.
+    """
+    items = list(items)
+    pdf = FPDF()
+    _cover_page(pdf, items)
+    for item in items:
+        _symbol_page(
+            pdf, item["symbol"], item["forecast_df"], item["signal_text"],
+            item["sentiment_score"], item.get("closes")
+        )
+
+    data = _to_bytes(pdf)
+    if file_path:
+        _write_atomic(file_path, data)
+    return data
+
+def _render_pages(items) -> list:
+    """
+    Worker side: the page content streams of a run of symbol pages.
+    Arial is the only font, registered first, so every document calls it /F1.
+    """
+    pdf = FPDF()
+    pdf.set_font("Arial", size=10)  # the cover page ends on this size
+    for item in items:
+        _symbol_page(
+            pdf, item["symbol"], item["forecast_df"], item["signal_text"],
+            item["sentiment_score"], item.get("closes")
+        )
+    pdf.close()
+    return [pdf.pages[n] for n in range(1, pdf.page + 1)]
+
+def render_watchlist_parallel(items, workers: int = None, file_path: str = None) -> bytes:
+    """
+    create_watchlist_report with the symbol pages drawn across processes, one run of
+    symbols per worker, then assembled in order behind the cover page into one PDF.
+    """
+    items = list(items)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(items) or 1))
+    if workers == 1:
+        return create_watchlist_report(items, file_path)
+
+    step = -(-len(items) // workers)
+    runs = [items[i:i + step] for i in range(0, len(items), step)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pages = [page for run in pool.map(_render_pages, runs) for page in run]
+
+    pdf = FPDF()
+    _cover_page(pdf, items)
+    for page in pages:
+        # ✅ Page content is position independent: open a page and drop the rendered stream in
+        pdf.add_page()
+        pdf.pages[pdf.page] = page
+
+    data = _to_bytes(pdf)
+    if file_path:
+        _write_atomic(file_path, data)
+    return data
+
+def export_watchlist_report(items, workers: int = None) -> str:
+    """
+    Saved as exports/watchlist_<input hash>.pdf, rendered (in parallel) only on a miss.
+    """
+    items = list(items)
+    h = hashlib.sha256()
+    for item in items:
+        h.update(report_digest(
+            item["symbol"], item["forecast_df"], item["signal_text"],
+            item["sentiment_score"], item.get("closes")
+        ).encode())
+    return get_export_store().write_bytes(
+        "watchlist", lambda: render_watchlist_parallel(items, workers=workers), "pdf", digest=h.hexdigest()[:16]
+    )
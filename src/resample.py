@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+OHLC_AGG = {
+    "Open": "first",
+    "High": "max",
+    "Low": "min",
+    "Close": "last",
+    "Adj Close": "last",
+    "Volume": "sum",
+}
+
+# Coarser and coarser periods tried by auto_resample
+PERIODS = ["D", "W", "M", "Q", "Y"]
+
+# Fixed bar intervals (yfinance names) -> pandas frequency; each divides a day
+INTERVALS = {
+    "1m": "1min", "2m": "2min", "5m": "5min", "15m": "15min", "30m": "30min",
+    "1h": "1h", "2h": "2h", "4h": "4h", "1d": "1D",
+}
+
+
+def interval_delta(interval: str) -> pd.Timedelta:
+    return pd.Timedelta(INTERVALS.get(interval, interval))
+
+
+def _dates(df: pd.DataFrame) -> pd.Series:
+    if "Date" in df.columns:
+        return pd.to_datetime(df["Date"])
+    return pd.Series(pd.to_datetime(df.index), index=df.index)
+
+
+def resample_ohlc(df: pd.DataFrame, period: str = "W") -> pd.DataFrame:
+    """
+    Aggregate bars to a coarser calendar period (W, M, Q, Y ...).
+    Open=first, High=max, Low=min, Close=last, Volume=sum, other columns take the last value.
+    Each bar is stamped with the date of its last source bar.
+    """
+    dates = _dates(df)
+    groups = dates.dt.to_period(period).to_numpy()
+
+    agg = {c: OHLC_AGG.get(c, "last") for c in df.columns if c != "Date"}
+    out = df.drop(columns=["Date"], errors="ignore").groupby(groups, sort=True).agg(agg)
+    out.insert(0, "Date", dates.groupby(groups, sort=True).last().to_numpy())
+    return out.reset_index(drop=True)
+
+
+def resample_bars(df: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """
+    Aggregate bars to a coarser fixed interval (1m -> 5m, 5m -> 1h, 1h -> 1d ...).
+    Bins are aligned to midnight and stamped with their start time; empty bins
+    (nights, weekends, halts) are dropped. Works on a Date column or a DatetimeIndex.
+    """
+    has_date = "Date" in df.columns
+    bars = df.set_index(pd.DatetimeIndex(df["Date"])).drop(columns=["Date"]) if has_date else df
+
+    agg = {c: OHLC_AGG.get(c, "last") for c in bars.columns}
+    out = bars.resample(INTERVALS.get(interval, interval), closed="left", label="left").agg(agg)
+    out = out[out["Close"].notna().to_numpy()]
+    out.index.name = "Date"
+    return out.reset_index() if has_date else out
+
+
+def resample_chunks(chunks, interval: str):
+    """
+    resample_bars over consecutive, time-sorted chunks (DatetimeIndex frames) so a long
+    intraday history never has to be in memory at once. The last bin of each chunk may still
+    be incomplete, so its rows are carried into the next chunk.
+    """
+    step = interval_delta(interval)
+    carry = None
+    for chunk in chunks:
+        if carry is not None and not carry.empty:
+            chunk = pd.concat([carry, chunk])
+        if chunk.empty:
+            continue
+        done = chunk.index < chunk.index[-1].floor(step)
+        carry = chunk[~done]
+        if done.any():
+            yield resample_bars(chunk[done], interval)
+    if carry is not None and not carry.empty:
+        yield resample_bars(carry, interval)
+
+
+def auto_resample(df: pd.DataFrame, max_bars: int):
+    """
+    Pick the finest period that keeps the bar count under max_bars.
+    Returns (frame, period) with period None when no aggregation was needed.
+    """
+    if len(df) <= max_bars:
+        return df, None
+
+    dates = _dates(df)
+    for period in PERIODS[1:]:
+        if dates.dt.to_period(period).nunique() <= max_bars:
+            return resample_ohlc(df, period), period
+    return resample_ohlc(df, PERIODS[-1]), PERIODS[-1]
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    Returns the indices of the n_out points that best keep the visual shape of (x, y).
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    picked = np.empty(n_out, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket is the third triangle point
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - cx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (cy - ay))
+        a = lo + int(np.argmax(area))
+        picked[i + 1] = a
+
+    return picked
+
+
+def downsample_line(dates, values, n_out: int):
+    """
+    LTTB on a time series; NaNs are dropped first. Returns (dates, values).
+    """
+    dates = pd.to_datetime(pd.Series(dates)).to_numpy()
+    values = np.asarray(values, dtype=np.float64)
+    ok = ~np.isnan(values)
+    dates, values = dates[ok], values[ok]
+
+    idx = lttb(dates.astype("datetime64[ns]").astype(np.int64), values, n_out)
+    return dates[idx], values[idx]
@@ -1,21 +1,94 @@
-import feedparser
-from textblob import TextBlob
+import hashlib
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 
-def fetch_news(symbol: str, max_items=8):
-    url = f"https://news.google.com/rss/search?q={symbol}+stock&hl=en-IN&gl=IN&ceid=IN:en"
-    feed = feedparser.parse(url)
+# feedparser / textblob (nltk) are imported on first use, they cost ~1s at startup
 
+# Feeds are reused for this long per symbol
+FEED_TTL_SECONDS = 10 * 60
+
+# Per-request network timeout and overall budget for a watchlist batch
+FETCH_TIMEOUT = 5
+BATCH_TIMEOUT = 10
+
+MAX_SCORES = 20000
+
+_lock = threading.Lock()
+_feed_cache = {}  # symbol -> (fetched_at, all feed items)
+_score_memo = OrderedDict()  # sha1(title) -> polarity
+
+
+def google_news_url(symbol: str) -> str:
+    return f"https://news.google.com/rss/search?q={symbol}+stock&hl=en-IN&gl=IN&ceid=IN:en"
+
+
+# symbol -> URL or local file path; swap with set_feed_source() in tests
+_feed_source = google_news_url
+
+
+def set_feed_source(source):
+    """
+    source(symbol) -> RSS URL or local .xml path. Clears cached feeds.
+    """
+    global _feed_source
+    _feed_source = source
+    with _lock:
+        _feed_cache.clear()
+
+
+def _read_feed(location: str, timeout: float):
+    import feedparser
+
+    if location.startswith(("http://", "https://")):
+        # ✅ feedparser has no timeout, so download ourselves
+        req = urllib.request.Request(location, headers={"User-Agent": "Mozilla/5.0"})
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return feedparser.parse(resp.read())
+    return feedparser.parse(location)
+
+
+def fetch_news(symbol: str, max_items=8, timeout=FETCH_TIMEOUT):
+    now = time.time()
+    with _lock:
+        cached = _feed_cache.get(symbol)
+    if cached is not None and now - cached[0] < FEED_TTL_SECONDS:
+        return [dict(item) for item in cached[1][:max_items]]
+
+    feed = _read_feed(_feed_source(symbol), timeout)
+
+    # ✅ The whole feed is cached, each call slices its own max_items from it
     news = []
-    for entry in feed.entries[:max_items]:
+    for entry in feed.entries:
         news.append({
             "title": entry.title,
             "link": entry.link,
             "published": getattr(entry, "published", "")
         })
-    return news
+
+    with _lock:
+        _feed_cache[symbol] = (now, news)
+    return [dict(item) for item in news[:max_items]]
 
 def sentiment_score(text: str) -> float:
-    return float(TextBlob(text).sentiment.polarity)
+    # Headlines repeat across reruns and symbols, score each one once
+    key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    with _lock:
+        if key in _score_memo:
+            _score_memo.move_to_end(key)
+            return _score_memo[key]
+
+    from textblob import TextBlob
+
+    score = float(TextBlob(text).sentiment.polarity)
+
+    with _lock:
+        _score_memo[key] = score
+        while len(_score_memo) > MAX_SCORES:
+            _score_memo.popitem(last=False)
+    return score
 
 def analyze_news_sentiment(symbol: str):
     news_items = fetch_news(symbol)
@@ -30,3 +103,32 @@ def analyze_news_sentiment(symbol: str):
 
     avg = sum(scores) / len(scores)
     return avg, news_items
+
+def analyze_many(symbols, timeout=BATCH_TIMEOUT, max_workers=8):
+    """
+    Sentiment for a whole watchlist, feeds fetched concurrently.
+    Symbols that fail or miss the time budget land in errors instead of blocking the rest.
+    Returns ({symbol: (avg, items)}, {symbol: error}).
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return {}, {}
+
+    pool = ThreadPoolExecutor(max_workers=min(max_workers, len(symbols)))
+    futures = {pool.submit(analyze_news_sentiment, s): s for s in symbols}
+    done, pending = wait(futures, timeout=timeout)
+
+    results, errors = {}, {}
+    for fut in done:
+        sym = futures[fut]
+        try:
+            results[sym] = fut.result()
+        except Exception as e:
+            errors[sym] = str(e)
+    for fut in pending:
+        fut.cancel()
+        errors[futures[fut]] = f"timed out after {timeout}s"
+
+    # Do not wait for stragglers; their sockets time out on their own
+    pool.shutdown(wait=False, cancel_futures=True)
+    return results, errors
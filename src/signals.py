@@ -1,18 +1,89 @@
+import numpy as np
 import pandas as pd
 
-def generate_signals(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+# ✅ Signals are stored as int8 codes, labels only at the UI/report edge
+BUY, HOLD, SELL = 1, 0, -1
 
-    close = df["Close"].squeeze()
-    ma20 = df["MA_20"].squeeze()
-    rsi = df["RSI"].squeeze()
+SIGNAL_LABELS = {BUY: "BUY ✅", SELL: "SELL ❌", HOLD: "HOLD"}
+PLAIN_LABELS = {BUY: "BUY", SELL: "SELL", HOLD: "HOLD"}
 
-    df["Signal"] = "HOLD"
+# name -> (rule function, description)
+RULES = {}
+
+DEFAULT_RULE = "rsi_ma20"
+
+
+def register_rule(name: str, description: str = ""):
+    """
+    Decorator for strategy rules: fn(df) -> (buy_mask, sell_mask).
+    SELL wins when both masks are set on the same bar.
+    """
+    def wrap(fn):
+        RULES[name] = (fn, description)
+        return fn
+    return wrap
+
+
+@register_rule(
+    "rsi_ma20",
+    "- **BUY** when RSI < 30 and Close > MA20  \n"
+    "- **SELL** when RSI > 70 or Close < MA20  \n"
+    "- Else HOLD"
+)
+def rsi_ma20(df: pd.DataFrame):
+    close = df["Close"].to_numpy()
+    ma20 = df["MA_20"].to_numpy()
+    rsi = df["RSI"].to_numpy()
 
     buy_condition = (rsi < 30) & (close > ma20)
     sell_condition = (rsi > 70) | (close < ma20)
+    return buy_condition, sell_condition
+
+
+@register_rule(
+    "macd_cross",
+    "- **BUY** when MACD crosses above its signal line  \n"
+    "- **SELL** when MACD crosses below its signal line  \n"
+    "- Else HOLD"
+)
+def macd_cross(df: pd.DataFrame):
+    hist = df["MACD_Hist"].to_numpy()
+    prev = np.roll(hist, 1)
+    prev[:1] = hist[:1]
+
+    buy_condition = (prev <= 0) & (hist > 0)
+    sell_condition = (prev >= 0) & (hist < 0)
+    return buy_condition, sell_condition
+
+
+def generate_signals(df: pd.DataFrame, rule: str = DEFAULT_RULE, inplace: bool = False) -> pd.DataFrame:
+    """
+    Adds an int8 Signal column (1 BUY, 0 HOLD, -1 SELL).
+    The input frame is left untouched unless inplace=True; columns are not copied.
+    """
+    if rule not in RULES:
+        raise ValueError(f"Unknown signal rule: {rule}")
+
+    buy_condition, sell_condition = RULES[rule][0](df)
+    codes = np.select([sell_condition, buy_condition], [SELL, BUY], HOLD).astype(np.int8)
+
+    out = df if inplace else df.copy(deep=False)
+    out["Signal"] = codes
+    return out
+
+
+def signal_label(code, emoji: bool = True) -> str:
+    labels = SIGNAL_LABELS if emoji else PLAIN_LABELS
+    return labels.get(int(code), "HOLD")
 
-    df.loc[buy_condition, "Signal"] = "BUY ✅"
-    df.loc[sell_condition, "Signal"] = "SELL ❌"
 
-    return df
+def label_signals(signal: pd.Series, emoji: bool = True) -> pd.Series:
+    """
+    Render codes as labels for display/export (Categorical, so still one byte per row).
+    """
+    labels = SIGNAL_LABELS if emoji else PLAIN_LABELS
+    return pd.Series(
+        pd.Categorical.from_codes(signal.to_numpy() + 1, [labels[SELL], labels[HOLD], labels[BUY]]),
+        index=signal.index,
+        name=signal.name
+    )
@@ -0,0 +1,83 @@
+import threading
+from contextlib import nullcontext
+
+from src.cache import stage_key
+
+
+class StageGraph:
+    """
+    Named pipeline stages with dependencies, computed only when something asks for them.
+
+    Each stage is keyed by its own params plus the versions of its dependencies.
+    A result is looked up first in `results` (one entry per stage, e.g. kept in
+    st.session_state so reruns of the same session reuse it), then in the shared
+    StageCache, and only then computed.
+    """
+
+    def __init__(self, results: dict = None, cache=None, timer=None):
+        self.results = {} if results is None else results
+        self.cache = cache
+        self.timer = timer
+        self.stages = {}
+        self.computed = []  # stages whose function ran in this graph, in order
+        self.shared = []  # stages served from the shared StageCache
+        self._lock = threading.RLock()
+
+    def add(self, name: str, fn, deps=(), params=(), version=None):
+        """
+        fn(*dep_values) -> value. params are the stage's own inputs (symbol, model name ...).
+        version(value) -> str replaces the key as seen by downstream stages,
+        e.g. data_version(df) so unchanged data keeps downstream hits.
+        """
+        self.stages[name] = (fn, tuple(deps), tuple(params), version)
+        return self
+
+    def requires(self, names) -> list:
+        """
+        Every stage `names` depend on (dependencies first), without computing anything.
+        """
+        order = []
+
+        def visit(name):
+            if name in order:
+                return
+            for dep in self.stages[name][1]:
+                visit(dep)
+            order.append(name)
+
+        for name in names:
+            visit(name)
+        return order
+
+    def get(self, name: str):
+        return self._resolve(name)[0]
+
+    def version(self, name: str) -> str:
+        # What downstream stages key on, e.g. data_version(df) for "load"
+        return self._resolve(name)[1]
+
+    def _resolve(self, name: str):
+        fn, deps, params, version = self.stages[name]
+        resolved = [self._resolve(dep) for dep in deps]
+        key = stage_key(name, params, tuple(v for _, v in resolved))
+
+        with self._lock:
+            hit = self.results.get(name)
+            if hit is not None and hit[0] == key:
+                return hit[1], hit[2]
+
+        args = [value for value, _ in resolved]
+        ran = []
+
+        def compute():
+            ran.append(name)
+            return fn(*args)
+
+        with self.timer.stage(name) if self.timer is not None else nullcontext():
+            value = self.cache.get_or_compute(name, key, compute) if self.cache is not None else compute()
+
+        out_version = version(value) if version is not None else key
+        with self._lock:
+            self.results[name] = (key, value, out_version)
+            (self.computed if ran else self.shared).append(name)
+        return value, out_version
@@ -0,0 +1,423 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from src.resample import interval_delta, resample_chunks
+
+STORE_DIR = "data/ohlcv"
+
+# Re-check Yahoo for new bars at most this often per symbol
+REFRESH_SECONDS = 15 * 60
+
+# Upper bound on concurrent per-symbol fetches
+MAX_FETCH_WORKERS = 8
+
+# Intervals downloaded and stored as-is; every other interval is resampled from one of these
+NATIVE_INTERVALS = ("1m", "5m", "1h", "1d")
+
+# Rows per Parquet row group / per chunk yielded by iter_bars
+CHUNK_ROWS = 250_000
+
+
+def source_interval(interval: str) -> str:
+    """
+    Stored interval a bar interval is built from: itself when native, else the coarsest
+    native interval that divides it (15m -> 5m, 4h -> 1h).
+    """
+    if interval in NATIVE_INTERVALS:
+        return interval
+    step = interval_delta(interval)
+    for native in sorted(NATIVE_INTERVALS, key=interval_delta, reverse=True):
+        if step % interval_delta(native) == pd.Timedelta(0):
+            return native
+    raise ValueError(f"Unsupported interval: {interval}")
+
+
+def store_key(symbol: str, interval: str = "1d") -> str:
+    # Daily bars keep the plain symbol name used before intervals existed
+    return symbol if interval == "1d" else f"{symbol}@{interval}"
+
+
+def normalize_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Flatten yfinance output into one bar per row with a tz-naive DatetimeIndex named Date.
+    """
+    if df is None or df.empty:
+        return pd.DataFrame()
+
+    # ✅ Fix MultiIndex columns
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+
+    if "Date" in df.columns:
+        df = df.set_index("Date")
+
+    df.index = pd.DatetimeIndex(df.index)
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    df.index.name = "Date"
+    df.columns.name = None
+
+    df = df[~df.index.duplicated(keep="last")]
+    return df.sort_index()
+
+
+# ---------------- FETCHERS ----------------
+class Fetcher:
+    """
+    Data source interface: fetch() one symbol, fetch_many() several at once.
+    """
+
+    max_workers = MAX_FETCH_WORKERS
+
+    def fetch(self, symbol: str, start=None, end=None, period=None, interval="1d") -> pd.DataFrame:
+        raise NotImplementedError
+
+    def fetch_many(self, symbols, start=None, end=None, interval="1d") -> dict:
+        # Default: bounded thread pool over fetch()
+        symbols = list(symbols)
+        if not symbols:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(symbols))) as pool:
+            results = pool.map(lambda s: self.fetch(s, start=start, end=end, interval=interval), symbols)
+            return dict(zip(symbols, results))
+
+
+class YahooFetcher(Fetcher):
+    # Yahoo only serves recent intraday history, and 1m at most 7 days per request
+    LOOKBACK = {"1m": pd.Timedelta(days=29), "5m": pd.Timedelta(days=59), "1h": pd.Timedelta(days=729)}
+    MAX_SPAN = {"1m": pd.Timedelta(days=7)}
+
+    def _ranges(self, start, end, interval):
+        # Clamp to what Yahoo still has and split into requests it accepts
+        now = pd.Timestamp.now().normalize() + pd.Timedelta(days=1)
+        end = pd.Timestamp(end) if end is not None else now
+        start = pd.Timestamp(start) if start is not None else end - self.LOOKBACK[interval]
+        start = max(start, now - self.LOOKBACK[interval])
+        span = self.MAX_SPAN.get(interval, end - start)
+        while start < end:
+            yield start, min(start + span, end)
+            start += span
+
+    def fetch(self, symbol: str, start=None, end=None, period=None, interval="1d") -> pd.DataFrame:
+        import yfinance as yf
+
+        if period is not None:
+            df = yf.download(symbol, period=period, interval=interval, progress=False)
+        elif interval in self.LOOKBACK:
+            parts = [
+                normalize_bars(yf.download(symbol, start=a, end=b, interval=interval, progress=False))
+                for a, b in self._ranges(start, end, interval)
+            ]
+            parts = [p for p in parts if not p.empty]
+            return normalize_bars(pd.concat(parts)) if parts else pd.DataFrame()
+        else:
+            df = yf.download(symbol, start=start, end=end, interval=interval, progress=False)
+        return normalize_bars(df)
+
+    def fetch_many(self, symbols, start=None, end=None, interval="1d") -> dict:
+        import yfinance as yf
+
+        symbols = list(symbols)
+        if not symbols:
+            return {}
+        if interval in self.LOOKBACK:
+            return super().fetch_many(symbols, start=start, end=end, interval=interval)
+
+        # ✅ One multi-ticker request instead of N round-trips
+        df = yf.download(symbols, start=start, end=end, interval=interval, group_by="ticker", progress=False)
+        return split_by_symbol(df, symbols)
+
+
+def split_by_symbol(df: pd.DataFrame, symbols) -> dict:
+    """
+    Split a (ticker, field) MultiIndex frame into per-symbol frames.
+    Symbols missing from the download map to an empty frame.
+    """
+    out = {}
+    tickers = set(df.columns.get_level_values(0)) if isinstance(df.columns, pd.MultiIndex) else set()
+
+    for sym in symbols:
+        if sym not in tickers:
+            out[sym] = pd.DataFrame()
+            continue
+        # Dates where this ticker did not trade come back as all-NaN rows
+        part = df[sym].dropna(how="all")
+        out[sym] = normalize_bars(part)
+    return out
+
+
+class LocalFetcher(Fetcher):
+    """
+    Serves bars from {root}/{SYMBOL}.csv files (Date column + OHLCV), e.g. test fixtures.
+    Intraday files are named {SYMBOL}@{interval}.csv.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def fetch(self, symbol: str, start=None, end=None, period=None, interval="1d") -> pd.DataFrame:
+        path = os.path.join(self.root, f"{store_key(symbol, interval)}.csv")
+        if not os.path.exists(path):
+            return pd.DataFrame()
+
+        df = normalize_bars(pd.read_csv(path, parse_dates=["Date"]))
+        if period is not None and not df.empty:
+            return slice_bars(df, df.index[-1] - _period_offset(period))
+        return slice_bars(df, start, end)
+
+
+def _period_offset(period: str) -> pd.DateOffset:
+    # yfinance style periods: 5d, 6mo, 1y
+    n = int("".join(ch for ch in period if ch.isdigit()) or 1)
+    if period.endswith("mo"):
+        return pd.DateOffset(months=n)
+    if period.endswith("y"):
+        return pd.DateOffset(years=n)
+    return pd.DateOffset(days=n)
+
+
+def slice_bars(df: pd.DataFrame, start=None, end=None) -> pd.DataFrame:
+    # end is exclusive, same as yf.download
+    if df.empty:
+        return df
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= df.index >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df.index < pd.Timestamp(end)
+    return df.loc[mask.values]
+
+
+# ---------------- STORE ----------------
+class OHLCVStore:
+    """
+    On-disk per-symbol, per-interval Parquet store.
+    Keeps every bar already downloaded and only asks the fetcher for missing head/tail ranges.
+    Only NATIVE_INTERVALS are stored; load() resamples the others from them.
+    """
+
+    def __init__(self, root: str = STORE_DIR, fetcher=None, refresh_seconds: int = REFRESH_SECONDS):
+        self.root = root
+        self.fetcher = fetcher or YahooFetcher()
+        self.refresh_seconds = refresh_seconds
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, symbol: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def _bars_path(self, symbol: str, interval: str = "1d") -> str:
+        return os.path.join(self.root, f"{store_key(symbol, interval)}.parquet")
+
+    def _meta_path(self, symbol: str, interval: str = "1d") -> str:
+        return os.path.join(self.root, f"{store_key(symbol, interval)}.json")
+
+    # ---------- raw io ----------
+    def read(self, symbol: str, interval: str = "1d") -> pd.DataFrame:
+        path = self._bars_path(symbol, interval)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return pd.read_parquet(path)
+
+    def iter_bars(self, symbol: str, interval: str = "1d", start=None, end=None, chunk_rows: int = CHUNK_ROWS):
+        """
+        Stored bars in [start, end) as consecutive chunks of at most chunk_rows rows,
+        read batch by batch instead of loading the whole file.
+        """
+        import pyarrow.parquet as pq
+
+        path = self._bars_path(symbol, interval)
+        if not os.path.exists(path):
+            return
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            chunk = batch.to_pandas()
+            if chunk.empty:
+                continue
+            # Bars are stored sorted, nothing after end is needed
+            if end is not None and chunk.index[0] >= pd.Timestamp(end):
+                break
+            chunk = slice_bars(chunk, start, end)
+            if not chunk.empty:
+                yield chunk
+
+    def _read_meta(self, symbol: str, interval: str = "1d") -> dict:
+        path = self._meta_path(symbol, interval)
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write(self, symbol: str, df: pd.DataFrame, meta: dict, interval: str = "1d"):
+        os.makedirs(self.root, exist_ok=True)
+
+        # ✅ Atomic replace so readers never see a half-written file
+        tmp = self._bars_path(symbol, interval) + ".tmp"
+        df.to_parquet(tmp, row_group_size=CHUNK_ROWS)
+        os.replace(tmp, self._bars_path(symbol, interval))
+
+        tmp = self._meta_path(symbol, interval) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, self._meta_path(symbol, interval))
+
+    # ---------- top-up ----------
+    def _tail_is_fresh(self, stored: pd.DataFrame, meta: dict, end, interval: str = "1d") -> bool:
+        if end is not None and pd.Timestamp(end) <= stored.index[-1] + interval_delta(interval):
+            return True
+        return time.time() - meta.get("fetched_at", 0) < self.refresh_seconds
+
+    def update(self, symbol: str, start="2018-01-01", end=None, interval: str = "1d") -> pd.DataFrame:
+        """
+        Make sure the stored history covers [start, end) and return the full stored frame.
+        interval must be one of NATIVE_INTERVALS.
+        """
+        symbol = symbol.strip().upper().replace(" ", "")
+
+        with self._lock(store_key(symbol, interval)):
+            stored = self.read(symbol, interval)
+            meta = self._read_meta(symbol, interval)
+            start_ts = pd.Timestamp(start) if start is not None else None
+
+            if stored.empty:
+                fresh = self.fetcher.fetch(symbol, start=start, end=end, interval=interval)
+
+                # ✅ Retry with 1 year data if empty
+                if fresh.empty and interval == "1d":
+                    fresh = self.fetcher.fetch(symbol, period="1y")
+                if fresh.empty:
+                    return fresh
+
+                meta = {"checked_from": str(start_ts or fresh.index[0]), "fetched_at": time.time()}
+                self._write(symbol, fresh, meta, interval)
+                return fresh
+
+            parts = [stored]
+            checked_from = pd.Timestamp(meta.get("checked_from", stored.index[0]))
+
+            # Missing head (user asked for an earlier start than we have)
+            if start_ts is not None and start_ts < checked_from:
+                parts.insert(0, self.fetcher.fetch(symbol, start=start, end=stored.index[0], interval=interval))
+                checked_from = start_ts
+
+            # Missing tail, re-fetching the last stored bar since it may have been partial
+            fetched_at = meta.get("fetched_at", 0)
+            if not self._tail_is_fresh(stored, meta, end, interval):
+                parts.append(self.fetcher.fetch(symbol, start=stored.index[-1], end=end, interval=interval))
+                fetched_at = time.time()
+
+            if len(parts) == 1 and str(checked_from) == meta.get("checked_from"):
+                return stored
+
+            merged = pd.concat([p for p in parts if not p.empty])
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+            self._write(symbol, merged, {"checked_from": str(checked_from), "fetched_at": fetched_at}, interval)
+            return merged
+
+    def _ingest(self, symbol: str, fresh: pd.DataFrame, start_ts, interval: str = "1d"):
+        # Merge bars fetched by a batch request and mark the tail as fresh
+        if fresh.empty:
+            return
+
+        with self._lock(store_key(symbol, interval)):
+            stored = self.read(symbol, interval)
+            meta = self._read_meta(symbol, interval)
+            checked_from = pd.Timestamp(meta.get("checked_from", start_ts or fresh.index[0]))
+            if start_ts is not None and start_ts < checked_from:
+                checked_from = start_ts
+
+            merged = fresh if stored.empty else pd.concat([stored, fresh])
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+            self._write(symbol, merged, {"checked_from": str(checked_from), "fetched_at": time.time()}, interval)
+
+    def _resampled(self, symbol: str, start, end, interval: str) -> pd.DataFrame:
+        # Built chunk by chunk from the stored source interval, never re-downloaded
+        parts = list(resample_chunks(self.iter_bars(symbol, source_interval(interval), start, end), interval))
+        return pd.concat(parts) if parts else pd.DataFrame()
+
+    def load(self, symbol: str, start="2018-01-01", end=None, interval: str = "1d") -> pd.DataFrame:
+        """
+        Return bars in [start, end), downloading only what is not stored yet.
+        """
+        source = source_interval(interval)
+        df = self.update(symbol, start=start, end=end, interval=source)
+        if source != interval:
+            if df.empty:
+                return df
+            del df  # resampling streams the source bars from disk instead
+            symbol = symbol.strip().upper().replace(" ", "")
+            resampled = self._resampled(symbol, start, end, interval)
+            return resampled if not resampled.empty else self._resampled(symbol, None, end, interval)
+
+        sliced = slice_bars(df, start, end)
+
+        # Keep the old behaviour of falling back to whatever recent history exists
+        return sliced if not sliced.empty else df
+
+    def load_many(self, symbols, start="2018-01-01", end=None, interval: str = "1d"):
+        """
+        Load several symbols with at most two batched fetches (new symbols, stale tails).
+        Returns (frames, errors) so one bad ticker does not abort the batch.
+        """
+        symbols = list(dict.fromkeys(s.strip().upper().replace(" ", "") for s in symbols))
+        start_ts = pd.Timestamp(start) if start is not None else None
+        source = source_interval(interval)
+
+        missing, stale, tail_from = [], [], None
+        for sym in symbols:
+            stored = self.read(sym, source)
+            if stored.empty:
+                missing.append(sym)
+            elif not self._tail_is_fresh(stored, self._read_meta(sym, source), end, source):
+                stale.append(sym)
+                last = stored.index[-1]
+                tail_from = last if tail_from is None else min(tail_from, last)
+
+        errors = {}
+        batches = [(missing, start), (stale, tail_from)]
+        for group, group_start in batches:
+            if not group:
+                continue
+            try:
+                fetched = self.fetcher.fetch_many(group, start=group_start, end=end, interval=source)
+            except Exception as e:
+                # Fall back to per-symbol loads below
+                errors.update({sym: f"batch fetch failed: {e}" for sym in group})
+                continue
+            for sym, fresh in fetched.items():
+                self._ingest(sym, fresh, start_ts if group is missing else None, source)
+
+        frames = {}
+        for sym in symbols:
+            try:
+                df = self.load(sym, start=start, end=end, interval=interval)
+                if df.empty:
+                    raise ValueError(f"No data found for symbol: {sym}")
+                frames[sym] = df
+                errors.pop(sym, None)
+            except Exception as e:
+                errors[sym] = str(e)
+        return frames, errors
+
+
+_default_store = None
+
+
+def get_store() -> OHLCVStore:
+    global _default_store
+    if _default_store is None:
+        _default_store = OHLCVStore()
+    return _default_store
+
+
+def set_fetcher(fetcher):
+    """
+    Swap the data source of the default store (e.g. LocalFetcher in tests).
+    """
+    get_store().fetcher = fetcher
@@ -0,0 +1,155 @@
+from collections import deque
+import math
+
+import pandas as pd
+
+FEATURE_NAMES = [
+    "MA_10", "MA_20", "MA_50",
+    "Return", "Volatility",
+    "RSI", "MACD", "MACD_Signal", "MACD_Hist"
+]
+
+# Re-sum the window from scratch every N updates to stop float drift
+RESYNC_EVERY = 1000
+
+
+class RollingWindow:
+    """
+    Fixed-size window with running sum / sum of squares, O(1) per push.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self._pushes = 0
+
+    def push(self, x: float):
+        if len(self.values) == self.size:
+            old = self.values[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.values.append(x)
+        self.total += x
+        self.total_sq += x * x
+
+        self._pushes += 1
+        if self._pushes % RESYNC_EVERY == 0:
+            self.total = math.fsum(self.values)
+            self.total_sq = math.fsum(v * v for v in self.values)
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.size
+
+    def mean(self) -> float:
+        return self.total / self.size if self.full else math.nan
+
+    def std(self) -> float:
+        # Sample std (ddof=1), same as pandas rolling().std()
+        if not self.full or self.size < 2:
+            return math.nan
+        var = (self.total_sq - self.total * self.total / self.size) / (self.size - 1)
+        return math.sqrt(max(var, 0.0))
+
+
+class EMA:
+    """
+    Exponential moving average with adjust=False semantics (seeded with the first value).
+    """
+
+    def __init__(self, span: int):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = None
+
+    def push(self, x: float) -> float:
+        if self.value is None:
+            self.value = x
+        else:
+            self.value = self.alpha * x + (1.0 - self.alpha) * self.value
+        return self.value
+
+
+class IndicatorEngine:
+    """
+    Stateful version of add_features(): each appended bar costs O(1)
+    and yields the same feature row the batch pandas code would.
+    """
+
+    def __init__(self, ma_windows=(10, 20, 50), vol_window=10, rsi_period=14, fast=12, slow=26, signal=9):
+        self.ma = {w: RollingWindow(w) for w in ma_windows}
+        self.vol = RollingWindow(vol_window)
+        self.gain = RollingWindow(rsi_period)
+        self.loss = RollingWindow(rsi_period)
+        self.ema_fast = EMA(fast)
+        self.ema_slow = EMA(slow)
+        self.ema_signal = EMA(signal)
+        self.prev_close = None
+
+    def update(self, close: float) -> dict:
+        """
+        Push one close and return the feature dict (values are NaN until warmed up).
+        """
+        close = float(close)
+
+        for window in self.ma.values():
+            window.push(close)
+
+        if self.prev_close is None:
+            ret = math.nan
+            delta = 0.0  # pandas: NaN delta -> 0 gain / 0 loss
+        else:
+            ret = close / self.prev_close - 1.0
+            delta = close - self.prev_close
+            self.vol.push(ret)
+        self.prev_close = close
+
+        self.gain.push(delta if delta > 0 else 0.0)
+        self.loss.push(-delta if delta < 0 else 0.0)
+        rs = self.gain.mean() / (self.loss.mean() + 1e-9)
+        rsi = 100 - (100 / (1 + rs))
+
+        macd = self.ema_fast.push(close) - self.ema_slow.push(close)
+        macd_signal = self.ema_signal.push(macd)
+
+        row = {f"MA_{w}": window.mean() for w, window in self.ma.items()}
+        row.update({
+            "Return": ret,
+            "Volatility": self.vol.std(),
+            "RSI": rsi,
+            "MACD": macd,
+            "MACD_Signal": macd_signal,
+            "MACD_Hist": macd - macd_signal,
+        })
+        return row
+
+    def update_bar(self, bar):
+        """
+        Push one OHLCV bar (dict / Series with Close) and return bar + features,
+        or None while the engine is still warming up (add_features drops those rows).
+        """
+        feats = self.update(bar["Close"])
+        if any(math.isnan(v) for v in feats.values()):
+            return None
+        row = dict(bar)
+        row.update(feats)
+        return row
+
+    def append(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Push new bars in order and return the warmed-up feature rows.
+        """
+        rows = [self.update_bar(bar) for bar in df.to_dict("records")]
+        rows = [r for r in rows if r is not None]
+        return pd.DataFrame(rows, columns=list(df.columns) + [c for c in FEATURE_NAMES if c not in df.columns])
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, **params):
+        """
+        Warm up an engine on existing history (one pass), ready for live bars.
+        """
+        engine = cls(**params)
+        for close in df["Close"].to_numpy():
+            engine.update(close)
+        return engine
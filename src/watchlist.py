@@ -1,21 +1,13 @@
-from src.utils import read_json, write_json
-
-WATCHLIST_FILE = "data/watchlist.json"
+from src import db
 
 def get_watchlist(username: str):
-    data = read_json(WATCHLIST_FILE, {})
-    return data.get(username, [])
+    db.init_db()
+    return db.get_symbols(username)
 
 def add_to_watchlist(username: str, symbol: str):
-    data = read_json(WATCHLIST_FILE, {})
-    if username not in data:
-        data[username] = []
-    if symbol not in data[username]:
-        data[username].append(symbol)
-    write_json(WATCHLIST_FILE, data)
+    db.init_db()
+    db.add_symbol(username, symbol)
 
 def remove_from_watchlist(username: str, symbol: str):
-    data = read_json(WATCHLIST_FILE, {})
-    if username in data and symbol in data[username]:
-        data[username].remove(symbol)
-    write_json(WATCHLIST_FILE, data)
+    db.init_db()
+    db.remove_symbol(username, symbol)
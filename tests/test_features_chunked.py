@@ -0,0 +1,53 @@
+"""
+add_features_chunked / iter_feature_chunks (slice at a time) must match add_features (whole history).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import add_features, add_features_chunked, iter_feature_chunks
+
+
+def make_intraday(n: int, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    dates = pd.date_range("2024-01-02 09:15", periods=n, freq="5min")
+    # Overnight gaps: time windows must not assume evenly spaced bars
+    dates = dates + pd.to_timedelta((np.arange(n) // 75) * 17, unit="h")
+    return pd.DataFrame({
+        "Date": dates,
+        "Open": close,
+        "High": close * 1.001,
+        "Low": close * 0.999,
+        "Close": close,
+        "Volume": rng.integers(100, 10_000, n),
+    })
+
+
+@pytest.fixture(scope="module")
+def bars():
+    return make_intraday(4000)
+
+
+@pytest.mark.parametrize("chunk_rows", [300, 1000, 5000])
+def test_chunked_matches_batch(bars, chunk_rows):
+    batch = add_features(bars)
+    chunked = add_features_chunked(bars, chunk_rows=chunk_rows)
+
+    assert list(chunked.index) == list(batch.index)
+    pd.testing.assert_frame_equal(chunked, batch, rtol=1e-9, atol=1e-9)
+
+
+def test_time_windows_match_batch(bars):
+    params = {"ma_windows": ("1h", "4h", "1D"), "vol_window": "2h"}
+    batch = add_features(bars, params)
+    chunked = add_features_chunked(bars, params, chunk_rows=500)
+
+    pd.testing.assert_frame_equal(chunked, batch, rtol=1e-9, atol=1e-9)
+
+
+def test_chunks_are_disjoint(bars):
+    chunks = (bars.iloc[i:i + 700] for i in range(0, len(bars), 700))
+    dates = pd.concat([part["Date"] for part in iter_feature_chunks(chunks)])
+
+    assert dates.is_unique and dates.is_monotonic_increasing
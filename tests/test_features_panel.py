@@ -0,0 +1,38 @@
+"""
+panel_features (one vectorized pass per trading calendar) must match add_features per symbol.
+"""
+import numpy as np
+import pandas as pd
+
+from src.features import FEATURE_COLS, add_features, panel_features
+
+
+def make_daily(dates, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+    return pd.DataFrame({
+        "Date": dates,
+        "Open": close,
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Volume": rng.integers(100, 10_000, len(dates)),
+    })
+
+
+def test_panel_matches_add_features_across_calendars():
+    us = pd.bdate_range("2022-01-03", periods=600)
+    # Different calendar and length: must not be aligned with (and gapped against) the others
+    other = pd.bdate_range("2022-01-05", periods=450)
+    frames = {"A": make_daily(us, 1), "B": make_daily(us, 2), "C": make_daily(other, 3)}
+
+    panel = panel_features(frames)
+
+    for sym, df in frames.items():
+        expected = add_features(df).set_index("Date")[FEATURE_COLS]
+        pd.testing.assert_frame_equal(panel[sym], expected, rtol=1e-9, atol=1e-9, check_freq=False)
+
+
+def test_panel_short_history_is_empty():
+    frames = {"A": make_daily(pd.bdate_range("2022-01-03", periods=30), 1)}
+    assert panel_features(frames)["A"].empty
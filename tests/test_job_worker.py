@@ -0,0 +1,26 @@
+"""
+Job pool workers must not re-run the parent's __main__ (the app script under Streamlit).
+"""
+import os
+import sys
+import types
+from concurrent.futures import ProcessPoolExecutor
+
+from src.job_worker import WORKER_CONTEXT
+
+
+def test_workers_do_not_run_parent_main(tmp_path, monkeypatch):
+    marker = tmp_path / "app_ran"
+    script = tmp_path / "app.py"
+    script.write_text(f"open({str(marker)!r}, 'w').close()\n")
+
+    # What Streamlit's script runner installs while a session runs
+    app_main = types.ModuleType("__main__")
+    app_main.__file__ = str(script)
+    monkeypatch.setitem(sys.modules, "__main__", app_main)
+
+    with ProcessPoolExecutor(1, mp_context=WORKER_CONTEXT) as pool:
+        assert pool.submit(os.getpid).result() != os.getpid()
+
+    assert not marker.exists()
+    assert sys.modules["__main__"] is app_main
@@ -0,0 +1,15 @@
+"""
+Cold start: a fresh interpreter renders the login page quickly and without the heavy stacks.
+"""
+from benchmarks.startup import time_to_login
+
+# Generous on purpose (shared CI machines), about 5x the usual time; heavy imports are caught by the check below
+MAX_LOGIN_SECONDS = 5.0
+
+
+def test_login_page_is_light_and_fast():
+    login = time_to_login(runs=1)
+
+    assert login["login_rendered"], login["errors"]
+    assert login["heavy_loaded"] == []
+    assert login["seconds"] < MAX_LOGIN_SECONDS
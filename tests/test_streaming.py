@@ -0,0 +1,85 @@
+"""
+IndicatorEngine (bar by bar) must match add_features (batch pandas) on the same history.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import add_features
+from src.streaming import FEATURE_NAMES, RESYNC_EVERY, IndicatorEngine
+
+
+def make_bars(n: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        "Date": pd.date_range("2010-01-01", periods=n, freq="D"),
+        "Open": close * (1 + rng.normal(0, 0.002, n)),
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Volume": rng.integers(1_000, 100_000, n),
+    })
+
+
+def stream(df: pd.DataFrame) -> pd.DataFrame:
+    engine = IndicatorEngine()
+    return pd.DataFrame([engine.update(c) for c in df["Close"].to_numpy()], columns=FEATURE_NAMES)
+
+
+@pytest.fixture(scope="module")
+def long_bars():
+    # Well past RESYNC_EVERY pushes so the periodic re-sum path runs several times
+    return make_bars(3 * RESYNC_EVERY + 500)
+
+
+def test_long_series_matches_batch(long_bars):
+    batch = add_features(long_bars)
+    live = stream(long_bars).loc[batch.index]
+
+    for col in FEATURE_NAMES:
+        assert np.allclose(live[col].to_numpy(), batch[col].to_numpy(), rtol=1e-9, atol=1e-9), col
+
+
+def test_warmup_rows_match_batch(long_bars):
+    head = long_bars.iloc[:80]
+    live = stream(head)
+    close = head["Close"]
+
+    # Same NaN pattern and values as the batch indicators before dropna()
+    expected = {
+        "MA_10": close.rolling(10).mean(),
+        "MA_20": close.rolling(20).mean(),
+        "MA_50": close.rolling(50).mean(),
+        "Return": close.pct_change(),
+        "Volatility": close.pct_change().rolling(10).std(),
+    }
+    for col, values in expected.items():
+        assert np.allclose(live[col].to_numpy(), values.to_numpy(), equal_nan=True), col
+
+
+def test_update_bar_drops_the_same_rows_as_add_features(long_bars):
+    head = long_bars.iloc[:200]
+    engine = IndicatorEngine()
+    kept = [i for i, bar in enumerate(head.to_dict("records")) if engine.update_bar(bar) is not None]
+
+    assert kept == list(add_features(head).index)
+
+
+def test_from_frame_then_append_matches_batch(long_bars):
+    split = 1200
+    engine = IndicatorEngine.from_frame(long_bars.iloc[:split])
+    live = engine.append(long_bars.iloc[split:])
+    batch = add_features(long_bars).loc[split:]
+
+    assert len(live) == len(batch)
+    for col in FEATURE_NAMES:
+        assert np.allclose(live[col].to_numpy(), batch[col].to_numpy(), rtol=1e-9, atol=1e-9), col
+
+
+def test_rsi_is_nan_until_the_window_is_full():
+    live = stream(make_bars(30))
+    assert live["RSI"].iloc[:13].isna().all()
+    assert not math.isnan(live["RSI"].iloc[13])